@@ -2,6 +2,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+def normalize_search_text(text):
+    """Lowercase and collapse whitespace for vendor search matching"""
+    return ' '.join(text.lower().split())
+
 class User(AbstractUser):
     USER_TYPES = (
         ('customer', 'Customer'),
@@ -25,6 +29,9 @@ class CustomerProfile(models.Model):
     pincode = models.CharField(max_length=10, blank=True)
 
 class VendorProfile(models.Model):
+    # Maintained with UPDATE ... F() by vendors.ratings and vendors.pricing
+    DENORMALIZED_FIELDS = ('rating', 'total_reviews', 'rating_sum', 'min_price', 'max_price')
+    
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     business_name = models.CharField(max_length=200)
     aadhaar_number = models.CharField(max_length=12, unique=True)
@@ -34,9 +41,49 @@ class VendorProfile(models.Model):
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=100)
     pincode = models.CharField(max_length=10)
+    # Pincode centroid, filled from vendors.Pincode by vendors.signals
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     is_verified = models.BooleanField(default=False)
     subscription_plan = models.CharField(max_length=20, default='basic')
     subscription_expires = models.DateTimeField(null=True, blank=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     total_reviews = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)  # Sum of review stars, keeps rating exact
+    # Cheapest and dearest service/package price, kept current by vendors.signals
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
     categories = models.JSONField(default=list)
+    # Denormalized text indexed for vendor search (see rebuild_vendor_search)
+    search_text = models.TextField(blank=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            # Matches the keyset ordering of the public vendor catalog
+            models.Index(fields=['is_verified', '-rating', '-id'], name='vendor_catalog_order_idx'),
+            # Bounding-box lookups for proximity search
+            models.Index(fields=['latitude', 'longitude'], name='vendor_geo_idx'),
+            # Price filters and price-ordered catalog pages
+            models.Index(fields=['is_verified', 'min_price', 'id'], name='vendor_min_price_idx'),
+            models.Index(fields=['is_verified', 'max_price', 'id'], name='vendor_max_price_idx'),
+        ]
+    
+    def build_search_text(self):
+        parts = [self.business_name, self.city, self.address] + list(self.categories or [])
+        return normalize_search_text(' '.join(str(part) for part in parts if part))
+    
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # A full save of a loaded profile would write back stale review/price counters
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'search_text'}
+            if 'pincode' in update_fields:
+                update_fields |= {'latitude', 'longitude'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
@@ -4,6 +4,8 @@ from django.contrib.auth import authenticate
 from .models import User, CustomerProfile, VendorProfile
 
 class UserSerializer(serializers.ModelSerializer):
+    date_created = serializers.DateTimeField(source='created_at', read_only=True)
+    
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'phone', 'user_type', 'date_created']
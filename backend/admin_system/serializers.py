@@ -65,9 +65,13 @@ class SubAdminSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'created_at', 'last_login', 'is_active']
 
 class VendorManagementSerializer(serializers.ModelSerializer):
+    vendor_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    email = serializers.EmailField(source='user.email', read_only=True)
+    phone_number = serializers.CharField(source='user.phone', read_only=True)
+    created_at = serializers.DateTimeField(source='user.created_at', read_only=True)
     total_bookings = serializers.IntegerField(read_only=True)
     total_revenue = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
-    is_blocked = serializers.BooleanField(read_only=True)
+    is_blocked = serializers.SerializerMethodField()
     
     class Meta:
         model = VendorProfile
@@ -76,18 +80,29 @@ class VendorManagementSerializer(serializers.ModelSerializer):
             'categories', 'rating', 'total_reviews', 'subscription_plan',
             'created_at', 'is_verified', 'total_bookings', 'total_revenue', 'is_blocked'
         ]
+    
+    def get_is_blocked(self, obj):
+        return obj.id in self.context.get('blocked_ids', ())
 
 class CustomerManagementSerializer(serializers.ModelSerializer):
+    user__first_name = serializers.CharField(source='user.first_name', read_only=True)
+    user__last_name = serializers.CharField(source='user.last_name', read_only=True)
+    user__email = serializers.EmailField(source='user.email', read_only=True)
+    user__phone = serializers.CharField(source='user.phone', read_only=True)
+    created_at = serializers.DateTimeField(source='user.created_at', read_only=True)
     total_bookings = serializers.IntegerField(read_only=True)
     total_spent = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
-    is_blocked = serializers.BooleanField(read_only=True)
+    is_blocked = serializers.SerializerMethodField()
     
     class Meta:
         model = CustomerProfile
         fields = [
-            'id', 'user__first_name', 'user__last_name', 'user__email', 
+            'id', 'user__first_name', 'user__last_name', 'user__email',
             'user__phone', 'created_at', 'total_bookings', 'total_spent', 'is_blocked'
         ]
+    
+    def get_is_blocked(self, obj):
+        return obj.id in self.context.get('blocked_ids', ())
 
 class VendorActionSerializer(serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.business_name', read_only=True)
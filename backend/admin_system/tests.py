@@ -0,0 +1,72 @@
+import json
+import uuid
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from accounts.models import CustomerProfile, User, VendorProfile
+from bookings.models import Booking
+from .models import AdminSession, AdminUser, CustomerAction, VendorAction
+from . import views
+
+class ManagementStreamingTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.admin = AdminUser.objects.create(email='eventsathi1@.com', password='x', admin_type='main')
+        AdminSession.objects.create(
+            admin_user=self.admin, session_token='token', ip_address='127.0.0.1', user_agent='test',
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.vendors = []
+        self.customers = []
+        for number in range(3):
+            vendor_user = User.objects.create(
+                username=f'vendor{number}', email=f'vendor{number}@example.com',
+                first_name='Vendor', last_name=str(number), phone=f'98{number}', user_type='vendor'
+            )
+            self.vendors.append(VendorProfile.objects.create(
+                user=vendor_user, business_name=f'Vendor {number}', aadhaar_number=f'a{number}',
+                pan_number=f'p{number}', address='MG Road', city='Pune', state='Maharashtra', pincode='411001'
+            ))
+            customer_user = User.objects.create(
+                username=f'customer{number}', email=f'customer{number}@example.com', first_name='Customer'
+            )
+            self.customers.append(CustomerProfile.objects.create(user=customer_user))
+        Booking.objects.create(
+            customer=self.customers[0], vendor=self.vendors[0], service_type='Photography',
+            booking_date=timezone.now(), event_date=timezone.now(), location='Pune', total_amount=25000
+        )
+    
+    def stream(self, view):
+        request = self.factory.get('/', {'stream': 'true'}, HTTP_AUTHORIZATION='AdminToken token')
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content))
+    
+    def block(self, action_model, target_field, target, action_type='block'):
+        action_model.objects.create(
+            admin_user=self.admin, action_type=action_type, **{target_field: uuid.UUID(int=target.id)}
+        )
+    
+    def test_vendor_management_stream(self):
+        self.block(VendorAction, 'vendor_id', self.vendors[1])
+        self.block(VendorAction, 'vendor_id', self.vendors[2])
+        self.block(VendorAction, 'vendor_id', self.vendors[2], 'unblock')
+        vendors = self.stream(views.vendor_management)
+        self.assertEqual([vendor['id'] for vendor in vendors], [vendor.id for vendor in self.vendors])
+        self.assertEqual(vendors[0]['vendor_name'], 'Vendor 0')
+        self.assertEqual(vendors[0]['email'], 'vendor0@example.com')
+        self.assertEqual(vendors[0]['phone_number'], '980')
+        self.assertEqual(vendors[0]['total_bookings'], 1)
+        self.assertEqual(vendors[0]['total_revenue'], '25000.00')
+        self.assertEqual([vendor['is_blocked'] for vendor in vendors], [False, True, False])
+    
+    def test_customer_management_stream(self):
+        self.block(CustomerAction, 'customer_id', self.customers[2])
+        customers = self.stream(views.customer_management)
+        self.assertEqual([customer['id'] for customer in customers], [customer.id for customer in self.customers])
+        self.assertEqual(customers[0]['user__first_name'], 'Customer')
+        self.assertEqual(customers[0]['user__email'], 'customer0@example.com')
+        self.assertEqual(customers[0]['total_bookings'], 1)
+        self.assertEqual(customers[1]['total_bookings'], 0)
+        self.assertEqual([customer['is_blocked'] for customer in customers], [False, False, True])
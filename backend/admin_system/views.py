@@ -1,6 +1,7 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from django.db.models import Count, Sum, Q
 from django.utils import timezone
 from datetime import timedelta
@@ -14,6 +15,10 @@ from .serializers import (
     VendorManagementSerializer, CustomerManagementSerializer, VendorActionSerializer
 )
 from vendors.models import VendorProfile
+from vendors.search import filter_vendors_by_search
+from vendors.cache import detail_cache_stats
+from categories.cache import homepage_image_cache
+from event_sathi.streaming import wants_streaming, iter_queryset, streaming_json_response
 from accounts.models import CustomerProfile, User
 
 class IsAdminAuthenticated(permissions.BasePermission):
@@ -144,22 +149,27 @@ def remove_sub_admin(request):
     except AdminUser.DoesNotExist:
         return Response({'error': 'Sub-admin not found'}, status=status.HTTP_404_NOT_FOUND)
 
+def _blocked_ids(actions, target_field):
+    """Ids whose latest admin action is a block; actions store them as UUID(int=id)"""
+    latest = {}
+    for target, action_type in actions.order_by('created_at', 'id').values_list(target_field, 'action_type'):
+        latest[target.int] = action_type
+    return {target for target, action_type in latest.items() if action_type == 'block'}
+
 @api_view(['GET'])
 @permission_classes([IsAdminAuthenticated])
 def vendor_management(request):
     """Get all vendors with management data"""
     vendors = VendorProfile.objects.annotate(
         total_bookings=Count('vendor_bookings'),
-        total_revenue=Sum('vendor_bookings__total_amount'),
-        is_blocked=Count('vendoraction', filter=Q(vendoraction__action_type='block'))
+        total_revenue=Sum('vendor_bookings__total_amount')
     ).select_related('user')
     
     # Filter options
     search = request.GET.get('search')
     if search:
         vendors = vendors.filter(
-            Q(business_name__icontains=search) |
-            Q(vendor_name__icontains=search) |
+            Q(id__in=filter_vendors_by_search(VendorProfile.objects.all(), search).values('id')) |
             Q(user__email__icontains=search)
         )
     
@@ -167,7 +177,15 @@ def vendor_management(request):
     if subscription_plan:
         vendors = vendors.filter(subscription_plan=subscription_plan)
     
-    serializer = VendorManagementSerializer(vendors, many=True)
+    context = {'blocked_ids': _blocked_ids(VendorAction.objects, 'vendor_id')}
+    if wants_streaming(request):
+        return streaming_json_response(
+            (VendorManagementSerializer(vendor, context=context).data
+             for vendor in iter_queryset(vendors.order_by('id'))),
+            encoder=JSONEncoder
+        )
+    
+    serializer = VendorManagementSerializer(vendors, many=True, context=context)
     return Response(serializer.data)
 
 @api_view(['GET'])
@@ -176,8 +194,7 @@ def customer_management(request):
     """Get all customers with management data"""
     customers = CustomerProfile.objects.annotate(
         total_bookings=Count('bookings'),
-        total_spent=Sum('bookings__total_amount'),
-        is_blocked=Count('customeraction', filter=Q(customeraction__action_type='block'))
+        total_spent=Sum('bookings__total_amount')
     ).select_related('user')
     
     # Filter options
@@ -189,7 +206,15 @@ def customer_management(request):
             Q(user__email__icontains=search)
         )
     
-    serializer = CustomerManagementSerializer(customers, many=True)
+    context = {'blocked_ids': _blocked_ids(CustomerAction.objects, 'customer_id')}
+    if wants_streaming(request):
+        return streaming_json_response(
+            (CustomerManagementSerializer(customer, context=context).data
+             for customer in iter_queryset(customers.order_by('id'))),
+            encoder=JSONEncoder
+        )
+    
+    serializer = CustomerManagementSerializer(customers, many=True, context=context)
     return Response(serializer.data)
 
 @api_view(['POST'])
@@ -221,11 +246,11 @@ def vendor_action(request):
         # Perform action
         if action_type == 'block':
             vendor.is_verified = False
-            vendor.save()
+            vendor.save(update_fields=['is_verified'])
             message = 'Vendor blocked successfully'
         elif action_type == 'unblock':
             vendor.is_verified = True
-            vendor.save()
+            vendor.save(update_fields=['is_verified'])
             message = 'Vendor unblocked successfully'
         elif action_type == 'remove':
             vendor.user.is_active = False
@@ -296,5 +321,7 @@ def admin_dashboard_stats(request):
     
     # Serialize recent actions
     stats['recent_vendor_actions'] = VendorActionSerializer(stats['recent_vendor_actions'], many=True).data
+    stats['vendor_detail_cache'] = detail_cache_stats()
+    stats['homepage_image_cache'] = homepage_image_cache.stats()
     
     return Response(stats)
\ No newline at end of file
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from accounts.models import VendorProfile
+from .models import VendorAvailabilityBlock, VendorBusyDay
+
+# Bookings in these states hold the vendor's date
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+class AvailabilityConflict(Exception):
+    """The requested dates overlap blocks the vendor already has"""
+    
+    def __init__(self, conflicts):
+        super().__init__('Vendor is not available on the requested dates')
+        self.conflicts = conflicts
+
+def event_day(event_date):
+    return timezone.localdate(event_date) if timezone.is_aware(event_date) else event_date.date()
+
+def booking_dates(booking):
+    """(start_date, end_date) a booking occupies: the local day of its event"""
+    day = event_day(booking.event_date)
+    return day, day
+
+def overlapping_blocks(vendor_id, start_date, end_date):
+    """Blocks of a vendor touching [start_date, end_date], via vendor_availability_idx"""
+    return VendorAvailabilityBlock.objects.filter(
+        vendor_id=vendor_id, start_date__lte=end_date, end_date__gte=start_date
+    )
+
+def describe_block(block):
+    return {
+        'kind': block.kind,
+        'start_date': block.start_date,
+        'end_date': block.end_date,
+        'booking_id': block.booking_id
+    }
+
+def lock_vendor(vendor_id):
+    """Serialize availability changes of one vendor until the transaction ends"""
+    return VendorProfile.objects.select_for_update().only('id').filter(pk=vendor_id).first()
+
+def ensure_available(vendor_id, start_date, end_date, exclude_booking_id=None, kinds=None):
+    """Lock the vendor and raise AvailabilityConflict if the dates are taken.
+    
+    Must run inside transaction.atomic(): the vendor row lock is held until
+    commit, so concurrent reservations for the same vendor are serialized and
+    the block written by the caller is visible to the next one.
+    """
+    lock_vendor(vendor_id)
+    blocks = overlapping_blocks(vendor_id, start_date, end_date)
+    if exclude_booking_id is not None:
+        blocks = blocks.exclude(booking_id=exclude_booking_id)
+    if kinds is not None:
+        blocks = blocks.filter(kind__in=kinds)
+    conflicts = [describe_block(block) for block in blocks]
+    if conflicts:
+        raise AvailabilityConflict(conflicts)
+
+def sync_booking_block(booking):
+    """Create, move or drop the block of a booking to match its status and date"""
+    if booking.status not in ACTIVE_STATUSES:
+        VendorAvailabilityBlock.objects.filter(booking=booking).delete()
+        return
+    start_date, end_date = booking_dates(booking)
+    VendorAvailabilityBlock.objects.update_or_create(
+        booking=booking,
+        defaults={
+            'vendor_id': booking.vendor_id,
+            'kind': 'booking',
+            'start_date': start_date,
+            'end_date': end_date
+        }
+    )
+
+def availability_on_dates(vendor_id, dates):
+    """Map each date to whether the vendor is free, in one indexed query"""
+    if not dates:
+        return {}
+    first, last = min(dates), max(dates)
+    busy = set()
+    blocks = overlapping_blocks(vendor_id, first, last).values_list('start_date', 'end_date')
+    for start_date, end_date in blocks:
+        # Only walk the part of a long blackout inside the requested window
+        busy.update(iter_days(max(start_date, first), min(end_date, last)))
+    return {day: day not in busy for day in sorted(set(dates))}
+
+def iter_days(start_date, end_date):
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+def refresh_busy_days(vendor_id, start_date, end_date):
+    """Re-derive a vendor's VendorBusyDay rows within [start_date, end_date] from its blocks"""
+    with transaction.atomic():
+        # Concurrent block changes of the same vendor would otherwise each see a stale set
+        lock_vendor(vendor_id)
+        covered = set()
+        blocks = overlapping_blocks(vendor_id, start_date, end_date).values_list('start_date', 'end_date')
+        for block_start, block_end in blocks:
+            covered.update(iter_days(max(block_start, start_date), min(block_end, end_date)))
+        
+        stored = set(VendorBusyDay.objects.filter(
+            vendor_id=vendor_id, day__range=(start_date, end_date)
+        ).values_list('day', flat=True))
+        if stored - covered:
+            VendorBusyDay.objects.filter(vendor_id=vendor_id, day__in=stored - covered).delete()
+        VendorBusyDay.objects.bulk_create(
+            [VendorBusyDay(vendor_id=vendor_id, day=day) for day in covered - stored],
+            ignore_conflicts=True
+        )
+
+def rebuild_busy_days():
+    """Recreate every VendorBusyDay row from the availability blocks"""
+    with transaction.atomic():
+        VendorBusyDay.objects.all().delete()
+        days = set()
+        blocks = VendorAvailabilityBlock.objects.values_list('vendor_id', 'start_date', 'end_date')
+        for vendor_id, start_date, end_date in blocks.iterator():
+            days.update((vendor_id, day) for day in iter_days(start_date, end_date))
+        VendorBusyDay.objects.bulk_create(
+            [VendorBusyDay(vendor_id=vendor_id, day=day) for vendor_id, day in days],
+            batch_size=1000
+        )
+    return len(days)
+
+def filter_vendors_available(vendors, start_date, end_date):
+    """Keep vendors free on every day of [start_date, end_date], via busy_day_vendor_idx"""
+    busy = VendorBusyDay.objects.filter(day__range=(start_date, end_date)).values('vendor_id')
+    return vendors.exclude(pk__in=busy)
@@ -0,0 +1,46 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import BookingMessage, BookingReadMarker
+
+def annotate_inbox(bookings, user):
+    """Add the latest message and the user's unread count to every booking.
+    
+    Both are correlated subqueries over booking_message_seq_idx, so the whole
+    inbox page is a single query however many threads it shows.
+    """
+    latest = BookingMessage.objects.filter(booking=OuterRef('pk')).order_by('-id')
+    last_read = BookingReadMarker.objects.filter(
+        booking=OuterRef('booking'), user=user
+    ).values('last_read_message_id')[:1]
+    unread = BookingMessage.objects.filter(
+        booking=OuterRef('pk'),
+        id__gt=Coalesce(Subquery(last_read), Value(0))
+    ).exclude(sender=user).order_by().values('booking').annotate(total=Count('id')).values('total')
+    
+    return bookings.annotate(
+        last_message_id=Subquery(latest.values('id')[:1]),
+        last_message_text=Subquery(latest.values('message')[:1]),
+        last_message_at=Subquery(latest.values('created_at')[:1]),
+        last_message_sender_id=Subquery(latest.values('sender_id')[:1]),
+        unread_count=Coalesce(Subquery(unread), Value(0), output_field=IntegerField()),
+        last_activity_at=Coalesce(Subquery(latest.values('created_at')[:1]), 'created_at')
+    )
+
+def mark_read(booking_id, user_id, message_id):
+    """Move a user's read marker forward to message_id; it never moves back"""
+    updated = BookingReadMarker.objects.filter(
+        booking_id=booking_id, user_id=user_id, last_read_message_id__lt=message_id
+    ).update(last_read_message_id=message_id)
+    if updated or BookingReadMarker.objects.filter(booking_id=booking_id, user_id=user_id).exists():
+        return
+    try:
+        with transaction.atomic():
+            BookingReadMarker.objects.create(
+                booking_id=booking_id, user_id=user_id, last_read_message_id=message_id
+            )
+    except IntegrityError:
+        # Created concurrently; move it forward instead
+        BookingReadMarker.objects.filter(
+            booking_id=booking_id, user_id=user_id, last_read_message_id__lt=message_id
+        ).update(last_read_message_id=message_id)
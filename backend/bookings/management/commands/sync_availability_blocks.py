@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bookings.models import Booking, VendorAvailabilityBlock
+from bookings.availability import ACTIVE_STATUSES, rebuild_busy_days, sync_booking_block
+
+class Command(BaseCommand):
+    help = 'Rebuild the availability blocks of all bookings (blackouts are kept) and the busy-day index'
+    
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            removed, _ = VendorAvailabilityBlock.objects.filter(kind='booking').exclude(
+                booking__status__in=ACTIVE_STATUSES
+            ).delete()
+            synced = 0
+            for booking in Booking.objects.filter(status__in=ACTIVE_STATUSES).iterator():
+                sync_booking_block(booking)
+                synced += 1
+            busy_days = rebuild_busy_days()
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced {synced} booking blocks, removed {removed} stale ones, {busy_days} busy vendor days"
+        ))
@@ -40,4 +40,57 @@ class BookingMessage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        ordering = ['created_at']
\ No newline at end of file
+        ordering = ['created_at']
+        indexes = [
+            # Latest message and unread counts per thread
+            models.Index(fields=['booking', 'id'], name='booking_message_seq_idx'),
+            # Keyset pages of a thread's history
+            models.Index(fields=['booking', 'created_at', 'id'], name='booking_message_time_idx'),
+        ]
+
+class BookingReadMarker(models.Model):
+    """Last message of a booking thread a user has read, for unread counts"""
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='read_markers')
+    user = models.ForeignKey('accounts.User', on_delete=models.CASCADE)
+    last_read_message_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['booking', 'user']
+
+class VendorAvailabilityBlock(models.Model):
+    """Dates a vendor is unavailable, from an active booking or a blackout"""
+    KIND_CHOICES = [
+        ('booking', 'Booking'),
+        ('blackout', 'Blackout'),
+    ]
+    
+    vendor = models.ForeignKey(VendorProfile, on_delete=models.CASCADE, related_name='availability_blocks')
+    booking = models.OneToOneField(Booking, on_delete=models.CASCADE, null=True, blank=True, related_name='availability_block')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Both ends inclusive, in the project time zone
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['vendor', 'start_date', 'end_date'], name='vendor_availability_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(check=models.Q(end_date__gte=models.F('start_date')), name='availability_block_dates'),
+        ]
+
+class VendorBusyDay(models.Model):
+    """One row per vendor and day covered by any availability block"""
+    vendor = models.ForeignKey(VendorProfile, on_delete=models.CASCADE, related_name='busy_days')
+    day = models.DateField()
+    
+    class Meta:
+        unique_together = ['vendor', 'day']
+        indexes = [
+            # Vendors busy on a day or range, for catalog date filters
+            models.Index(fields=['day', 'vendor'], name='busy_day_vendor_idx'),
+        ]
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from django.conf import settings
+from django.db import connection, connections, transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'booking_messages'
+
+class MessageBroker:
+    """In-process fan-out of "booking X has new messages" to waiting streams.
+    
+    Subscribers only learn that something changed and re-read from their last
+    id, so a burst of messages wakes each stream once and nothing is queued.
+    """
+    
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, booking_id):
+        """Register the running event loop for a booking; returns the asyncio.Event to wait on"""
+        wakeup = asyncio.Event()
+        subscriber = (asyncio.get_running_loop(), wakeup)
+        with self._lock:
+            self._subscribers.setdefault(booking_id, set()).add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, booking_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(booking_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[booking_id]
+    
+    def publish(self, booking_id):
+        """Wake every stream of a booking; safe to call from any thread"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(booking_id, ()))
+        for loop, wakeup in subscribers:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The stream's loop has already closed
+                pass
+    
+    def publish_all(self):
+        with self._lock:
+            booking_ids = list(self._subscribers)
+        for booking_id in booking_ids:
+            self.publish(booking_id)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'bookings': len(self._subscribers),
+                'streams': sum(len(subscribers) for subscribers in self._subscribers.values())
+            }
+
+broker = MessageBroker()
+
+def uses_pg_notify():
+    return settings.BOOKING_CHAT_PG_NOTIFY and connection.vendor == 'postgresql'
+
+def announce_message(message):
+    """Tell every process's streams about a new message once it is committed"""
+    if uses_pg_notify():
+        # NOTIFY is transactional: listeners hear it only if the message commits
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, f"{message.booking_id}:{message.id}"])
+    else:
+        booking_id = message.booking_id
+        transaction.on_commit(lambda: broker.publish(booking_id))
+
+_listener = None
+_listener_lock = threading.Lock()
+
+def _listen_forever():
+    while True:
+        listener = connections.create_connection('default')
+        try:
+            listener.ensure_connection()
+            listener.set_autocommit(True)
+            with listener.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            # Messages sent while (re)connecting were not heard, let every stream re-read
+            broker.publish_all()
+            raw = listener.connection
+            while True:
+                if select.select([raw], [], [], 60) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    notify = raw.notifies.pop(0)
+                    broker.publish(int(notify.payload.split(':', 1)[0]))
+        except Exception:
+            logger.exception('Booking message listener lost its connection')
+            time.sleep(5)
+        finally:
+            listener.close()
+
+def ensure_listener():
+    """Start this process's LISTEN thread the first time a stream opens"""
+    global _listener
+    if not uses_pg_notify():
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen_forever, name='booking-messages-listener', daemon=True)
+            _listener.start()
+
+def sse_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, cls=JSONEncoder)}")
+    return '\n'.join(lines) + '\n\n'
+
+async def stream_messages(booking_id, last_id, fetch_after):
+    """Server-Sent Events for messages after last_id, then for each new one.
+    
+    fetch_after(booking_id, last_id) is an async callable returning up to
+    STREAM_CHUNK_SIZE serialized messages with a larger id, in id order. The stream ends after
+    BOOKING_CHAT_STREAM_SECONDS; EventSource reconnects with Last-Event-ID.
+    """
+    # Subscribe before catching up so a message sent in between is not missed
+    subscriber = broker.subscribe(booking_id)
+    _, wakeup = subscriber
+    deadline = time.monotonic() + settings.BOOKING_CHAT_STREAM_SECONDS
+    try:
+        yield f"retry: {settings.BOOKING_CHAT_RETRY_MS}\n\n"
+        while True:
+            wakeup.clear()
+            while True:
+                messages = await fetch_after(booking_id, last_id)
+                for message in messages:
+                    last_id = message['id']
+                    yield sse_event('message', message, event_id=last_id)
+                if len(messages) < settings.STREAM_CHUNK_SIZE:
+                    break
+            
+            while not wakeup.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    await asyncio.wait_for(
+                        wakeup.wait(), timeout=min(settings.BOOKING_CHAT_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Comment lines keep proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(booking_id, subscriber)
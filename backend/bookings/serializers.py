@@ -1,5 +1,6 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Booking, BookingMessage
+from .models import Booking, BookingMessage, VendorAvailabilityBlock
 from accounts.serializers import CustomerProfileSerializer, VendorProfileSerializer, UserSerializer
 from events.serializers import EventSerializer
 
@@ -26,4 +27,20 @@ class BookingMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = BookingMessage
         fields = '__all__'
-        read_only_fields = ['sender', 'created_at']
\ No newline at end of file
+        read_only_fields = ['booking', 'sender', 'created_at']
+
+class BlackoutSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VendorAvailabilityBlock
+        fields = ['id', 'start_date', 'end_date', 'reason', 'created_at']
+        read_only_fields = ['created_at']
+    
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError({'end_date': 'Must not be before start_date'})
+        # Every day of a blackout becomes a VendorBusyDay row
+        if (data['end_date'] - data['start_date']).days >= settings.AVAILABILITY_MAX_DAYS:
+            raise serializers.ValidationError(
+                {'end_date': f"A blackout can span at most {settings.AVAILABILITY_MAX_DAYS} days"}
+            )
+        return data
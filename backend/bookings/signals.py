@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import Booking, BookingMessage, VendorAvailabilityBlock
+from .inbox import mark_read
+from .realtime import announce_message
+from .availability import refresh_busy_days, sync_booking_block
+
+@receiver(post_save, sender=BookingMessage)
+def booking_message_sent(sender, instance, created, raw=False, **kwargs):
+    """A sender has read everything up to their own message; open streams get it pushed"""
+    if raw or not created:
+        return
+    mark_read(instance.booking_id, instance.sender_id, instance.id)
+    announce_message(instance)
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, raw=False, **kwargs):
+    """Keep the booking's availability block in step with its status and date"""
+    if raw:
+        return
+    sync_booking_block(instance)
+
+@receiver(pre_save, sender=VendorAvailabilityBlock)
+def availability_block_changing(sender, instance, raw=False, **kwargs):
+    """Remember the stored interval so post_save can also free the days it left"""
+    instance._previous_interval = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_interval = VendorAvailabilityBlock.objects.filter(pk=instance.pk).values_list(
+        'vendor_id', 'start_date', 'end_date'
+    ).first()
+
+@receiver(post_save, sender=VendorAvailabilityBlock)
+def availability_block_saved(sender, instance, raw=False, **kwargs):
+    """Keep VendorBusyDay in step with the block's dates"""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_interval', None)
+    if previous is not None and previous[0] != instance.vendor_id:
+        refresh_busy_days(*previous)
+        previous = None
+    start_date, end_date = instance.start_date, instance.end_date
+    if previous is not None:
+        start_date, end_date = min(start_date, previous[1]), max(end_date, previous[2])
+    refresh_busy_days(instance.vendor_id, start_date, end_date)
+
+@receiver(post_delete, sender=VendorAvailabilityBlock)
+def availability_block_deleted(sender, instance, **kwargs):
+    refresh_busy_days(instance.vendor_id, instance.start_date, instance.end_date)
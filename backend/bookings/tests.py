@@ -0,0 +1,221 @@
+from datetime import date
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from accounts.models import CustomerProfile, User, VendorProfile
+from .models import Booking, BookingMessage, VendorAvailabilityBlock, VendorBusyDay
+from . import views
+
+def make_vendor(**fields):
+    user = User.objects.create(username='vendor', email='vendor@example.com', user_type='vendor')
+    values = {
+        'user': user,
+        'business_name': 'Vendor',
+        'aadhaar_number': 'a1',
+        'pan_number': 'p1',
+        'address': 'MG Road',
+        'city': 'Pune',
+        'state': 'Maharashtra',
+        'pincode': '411001',
+    }
+    values.update(fields)
+    return VendorProfile.objects.create(**values)
+
+def make_customer(number=0):
+    user = User.objects.create(username=f'customer{number}', email=f'customer{number}@example.com')
+    return CustomerProfile.objects.create(user=user)
+
+def make_booking(customer, vendor, **fields):
+    values = {
+        'customer': customer,
+        'vendor': vendor,
+        'service_type': 'Photography',
+        'booking_date': timezone.now(),
+        'event_date': timezone.now(),
+        'location': 'Pune',
+        'total_amount': 25000,
+    }
+    values.update(fields)
+    return Booking.objects.create(**values)
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.vendor = make_vendor(is_verified=True)
+        self.customer_user = make_customer().user
+    
+    def call(self, view, method, user, data=None, **kwargs):
+        request = getattr(self.factory, method)('/', data, format='json' if method != 'get' else None)
+        force_authenticate(request, user=user)
+        return view(request, **kwargs)
+    
+    def book(self, day):
+        return self.call(views.booking_list, 'post', self.customer_user, {
+            'vendor': self.vendor.id,
+            'service_type': 'Photography',
+            'booking_date': '2026-10-01T10:00:00+05:30',
+            'event_date': f'{day}T18:00:00+05:30',
+            'location': 'Pune',
+            'total_amount': '25000.00',
+        })
+    
+    def set_status(self, booking_id, new_status):
+        return self.call(views.booking_detail, 'put', self.vendor.user, {'status': new_status}, booking_id=booking_id)
+    
+    def test_second_booking_on_the_same_day_conflicts(self):
+        first = self.book('2027-02-14')
+        self.assertEqual(first.status_code, 201)
+        
+        response = self.book('2027-02-14')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'][0]['booking_id'], first.data['id'])
+        self.assertEqual(Booking.objects.count(), 1)
+        
+        self.assertEqual(self.book('2027-02-15').status_code, 201)
+    
+    def test_event_day_is_the_local_date(self):
+        # 20:00 UTC on the 13th is already the 14th in Asia/Kolkata
+        self.assertEqual(self.book('2027-02-14').status_code, 201)
+        response = self.call(views.booking_list, 'post', self.customer_user, {
+            'vendor': self.vendor.id, 'service_type': 'Photography',
+            'booking_date': '2026-10-01T10:00:00Z', 'event_date': '2027-02-13T20:00:00Z',
+            'location': 'Pune', 'total_amount': '25000.00',
+        })
+        self.assertEqual(response.status_code, 409)
+    
+    def test_cancelling_frees_the_day_and_reactivating_rechecks_it(self):
+        booking_id = self.book('2027-02-14').data['id']
+        self.assertEqual(self.set_status(booking_id, 'cancelled').status_code, 200)
+        self.assertFalse(VendorAvailabilityBlock.objects.filter(booking_id=booking_id).exists())
+        
+        self.assertEqual(self.book('2027-02-14').status_code, 201)
+        response = self.set_status(booking_id, 'confirmed')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.get(id=booking_id).status, 'cancelled')
+    
+    def test_blackouts(self):
+        self.assertEqual(self.book('2027-02-14').status_code, 201)
+        
+        response = self.call(views.vendor_blackouts, 'post', self.vendor.user, {
+            'start_date': '2027-02-10', 'end_date': '2027-02-20'
+        })
+        self.assertEqual(response.status_code, 409)
+        
+        response = self.call(views.vendor_blackouts, 'post', self.vendor.user, {
+            'start_date': '2027-02-15', 'end_date': '2027-02-20', 'reason': 'Holiday'
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.book('2027-02-17').status_code, 409)
+        self.assertEqual(
+            set(VendorBusyDay.objects.filter(vendor=self.vendor).values_list('day', flat=True)),
+            {date(2027, 2, day) for day in range(14, 21)}
+        )
+    
+    def test_oversized_blackout_is_rejected(self):
+        response = self.call(views.vendor_blackouts, 'post', self.vendor.user, {
+            'start_date': '0001-01-01', 'end_date': '9999-12-31'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end_date', response.data)
+        self.assertFalse(VendorBusyDay.objects.exists())
+        
+        response = self.call(views.vendor_blackouts, 'post', self.vendor.user, {
+            'start_date': '2027-01-01', 'end_date': '2027-12-31'
+        })
+        self.assertEqual(response.status_code, 201)
+    
+    def test_availability_query(self):
+        self.book('2027-02-14')
+        response = self.call(
+            views.vendor_availability, 'get', None,
+            {'dates': '2027-02-13,2027-02-14'}, vendor_id=self.vendor.id
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['available'])
+        self.assertEqual(
+            [(str(day['date']), day['available']) for day in response.data['dates']],
+            [('2027-02-13', True), ('2027-02-14', False)]
+        )
+
+class MessagePaginationTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        customer = make_customer()
+        self.user = customer.user
+        self.booking = make_booking(customer, make_vendor())
+        self.ids = [
+            BookingMessage.objects.create(booking=self.booking, sender=self.user, message=f'Message {n}').id
+            for n in range(5)
+        ]
+    
+    def get(self, **params):
+        request = self.factory.get('/', params)
+        force_authenticate(request, user=self.user)
+        return views.booking_messages(request, booking_id=self.booking.id)
+    
+    def page(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200)
+        links = response.get('Link', '')
+        return [message['id'] for message in response.data], 'rel="prev"' in links, 'rel="next"' in links
+    
+    def test_link_header_points_at_the_neighbouring_pages(self):
+        response = self.get(limit=2, before=self.ids[3])
+        self.assertEqual(response['Link'], (
+            f'<http://testserver/?before={self.ids[1]}&limit=2>; rel="prev", '
+            f'<http://testserver/?after={self.ids[2]}&limit=2>; rel="next"'
+        ))
+    
+    def test_newest_page_and_paging_back(self):
+        self.assertEqual(self.page(limit=2), (self.ids[3:], True, False))
+        self.assertEqual(self.page(limit=2, before=self.ids[3]), (self.ids[1:3], True, True))
+        self.assertEqual(self.page(limit=2, before=self.ids[1]), (self.ids[:1], False, True))
+    
+    def test_paging_forward(self):
+        self.assertEqual(self.page(limit=2, after=0), (self.ids[:2], False, True))
+        self.assertEqual(self.page(limit=2, after=self.ids[1]), (self.ids[2:4], True, True))
+        self.assertEqual(self.page(limit=2, after=self.ids[3]), (self.ids[4:], True, False))
+        self.assertEqual(self.page(limit=2, after=self.ids[4]), ([], False, False))
+    
+    def test_deleted_cursor_message_seeks_on_id(self):
+        BookingMessage.objects.filter(id__in=[self.ids[2], self.ids[4]]).delete()
+        self.assertEqual(self.page(since=self.ids[2]), ([self.ids[3]], True, False))
+        self.assertEqual(self.page(after=self.ids[4]), ([], False, False))
+        self.assertEqual(self.page(before=self.ids[2]), (self.ids[:2], False, True))
+        self.assertEqual(self.page(since=10 ** 6), ([], False, False))
+    
+    def test_invalid_parameters(self):
+        for params in [{'before': 0}, {'after': -1}, {'before': 1, 'after': 1}, {'limit': 0}, {'limit': 'x'}]:
+            self.assertEqual(self.get(**params).status_code, 400, params)
+
+class InboxQueryCountTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.vendor = make_vendor()
+        self.customer_count = 0
+    
+    def add_threads(self, count):
+        for _ in range(count):
+            self.customer_count += 1
+            customer = make_customer(self.customer_count)
+            booking = make_booking(customer, self.vendor)
+            for sender in [customer.user, self.vendor.user]:
+                BookingMessage.objects.create(booking=booking, sender=sender, message='Hello')
+    
+    def inbox(self):
+        request = self.factory.get('/')
+        force_authenticate(request, user=self.vendor.user)
+        # Customer then vendor profile lookup, COUNT for the paginator and the annotated page
+        with self.assertNumQueries(4):
+            response = views.booking_inbox(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+    
+    def test_query_count_does_not_grow_with_threads(self):
+        self.add_threads(3)
+        self.assertEqual(len(self.inbox()), 3)
+        
+        self.add_threads(3)
+        threads = self.inbox()
+        self.assertEqual(len(threads), 6)
+        self.assertTrue(all(thread['last_message']['message'] == 'Hello' for thread in threads))
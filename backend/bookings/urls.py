@@ -3,6 +3,12 @@ from . import views
 
 urlpatterns = [
     path('', views.booking_list, name='booking_list'),
+    path('inbox/', views.booking_inbox, name='booking_inbox'),
+    path('availability/<int:vendor_id>/', views.vendor_availability, name='vendor_availability'),
+    path('blackouts/', views.vendor_blackouts, name='vendor_blackouts'),
+    path('blackouts/<int:block_id>/', views.delete_vendor_blackout, name='delete_vendor_blackout'),
     path('<int:booking_id>/', views.booking_detail, name='booking_detail'),
     path('<int:booking_id>/messages/', views.booking_messages, name='booking_messages'),
+    path('<int:booking_id>/messages/stream/', views.booking_message_stream, name='booking_message_stream'),
+    path('<int:booking_id>/read/', views.booking_mark_read, name='booking_mark_read'),
 ]
\ No newline at end of file
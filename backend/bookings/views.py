@@ -2,10 +2,37 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from django.db.models import Q
-from .models import Booking, BookingMessage
-from .serializers import BookingSerializer, CreateBookingSerializer, BookingMessageSerializer
+from django.utils.dateparse import parse_date
+from .models import Booking, BookingMessage, VendorAvailabilityBlock
+from .serializers import BookingSerializer, CreateBookingSerializer, BookingMessageSerializer, BlackoutSerializer
+from .inbox import annotate_inbox, mark_read
+from .realtime import ensure_listener, stream_messages
+from .availability import (
+    ACTIVE_STATUSES, AvailabilityConflict, booking_dates, ensure_available, event_day, availability_on_dates
+)
 from accounts.models import CustomerProfile, VendorProfile
+from vendors.pagination import KeysetPaginator
+
+def _user_bookings(user):
+    """Bookings of the user's customer or vendor profile, or None without a profile"""
+    try:
+        customer_profile = CustomerProfile.objects.get(user=user)
+        return Booking.objects.filter(customer=customer_profile)
+    except CustomerProfile.DoesNotExist:
+        try:
+            vendor_profile = VendorProfile.objects.get(user=user)
+            return Booking.objects.filter(vendor=vendor_profile)
+        except VendorProfile.DoesNotExist:
+            return None
 
 @api_view(['GET', 'POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -13,16 +40,10 @@ def booking_list(request):
     """List bookings or create new booking"""
     if request.method == 'GET':
         # Get bookings based on user type
-        try:
-            customer_profile = CustomerProfile.objects.get(user=request.user)
-            bookings = Booking.objects.filter(customer=customer_profile)
-        except CustomerProfile.DoesNotExist:
-            try:
-                vendor_profile = VendorProfile.objects.get(user=request.user)
-                bookings = Booking.objects.filter(vendor=vendor_profile)
-            except VendorProfile.DoesNotExist:
-                return Response({'error': 'Profile not found'}, 
-                              status=status.HTTP_400_BAD_REQUEST)
+        bookings = _user_bookings(request.user)
+        if bookings is None:
+            return Response({'error': 'Profile not found'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
         
         # Filter by status
         status_filter = request.GET.get('status')
@@ -44,11 +65,89 @@ def booking_list(request):
         
         serializer = CreateBookingSerializer(data=request.data)
         if serializer.is_valid():
-            booking = serializer.save(customer=customer_profile)
+            vendor = serializer.validated_data['vendor']
+            day = event_day(serializer.validated_data['event_date'])
+            try:
+                # The vendor row stays locked until the booking and its block are committed
+                with transaction.atomic():
+                    ensure_available(vendor.id, day, day)
+                    booking = serializer.save(customer=customer_profile)
+            except AvailabilityConflict as e:
+                return Response({'error': str(e), 'conflicts': e.conflicts}, 
+                              status=status.HTTP_409_CONFLICT)
             return Response(BookingSerializer(booking).data, 
                           status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def booking_inbox(request):
+    """Bookings with their latest message and unread count, most recent activity first"""
+    bookings = _user_bookings(request.user)
+    if bookings is None:
+        return Response({'error': 'Profile not found'}, 
+                      status=status.HTTP_400_BAD_REQUEST)
+    
+    status_filter = request.GET.get('status')
+    if status_filter:
+        bookings = bookings.filter(status=status_filter)
+    
+    bookings = annotate_inbox(
+        bookings.select_related('customer__user', 'vendor'), request.user
+    ).order_by('-last_activity_at', '-id')
+    
+    paginator = PageNumberPagination()
+    paginator.page_size = 20
+    result_page = paginator.paginate_queryset(bookings, request)
+    inbox = [{
+        'id': booking.id,
+        'status': booking.status,
+        'service_type': booking.service_type,
+        'event_date': booking.event_date,
+        'vendor_id': booking.vendor_id,
+        'vendor_name': booking.vendor.business_name,
+        'customer_id': booking.customer_id,
+        'customer_name': booking.customer.user.get_full_name() or booking.customer.user.username,
+        'last_message': {
+            'id': booking.last_message_id,
+            'message': booking.last_message_text,
+            'sender_id': booking.last_message_sender_id,
+            'created_at': booking.last_message_at
+        } if booking.last_message_id else None,
+        'unread_count': booking.unread_count
+    } for booking in result_page]
+    return paginator.get_paginated_response(inbox)
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def booking_mark_read(request, booking_id):
+    """Mark a booking thread read up to message_id, or up to its latest message"""
+    try:
+        booking = Booking.objects.select_related('customer', 'vendor').get(id=booking_id)
+    except Booking.DoesNotExist:
+        return Response({'error': 'Booking not found'}, 
+                       status=status.HTTP_404_NOT_FOUND)
+    
+    # Check permissions
+    if (booking.customer.user_id != request.user.id and 
+        booking.vendor.user_id != request.user.id):
+        return Response({'error': 'Permission denied'}, 
+                       status=status.HTTP_403_FORBIDDEN)
+    
+    messages = BookingMessage.objects.filter(booking=booking)
+    message_id = request.data.get('message_id')
+    if message_id is not None:
+        try:
+            messages = messages.filter(id__lte=int(message_id))
+        except (TypeError, ValueError):
+            return Response({'error': 'message_id must be a number'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+    
+    last_read = messages.order_by('-id').values_list('id', flat=True).first()
+    if last_read is not None:
+        mark_read(booking.id, request.user.id, last_read)
+    return Response({'booking_id': booking.id, 'last_read_message_id': last_read})
+
 @api_view(['GET', 'PUT'])
 @permission_classes([permissions.IsAuthenticated])
 def booking_detail(request, booking_id):
@@ -76,33 +175,124 @@ def booking_detail(request, booking_id):
             data = {k: v for k, v in request.data.items() if k in allowed_fields}
             serializer = BookingSerializer(booking, data=data, partial=True)
             if serializer.is_valid():
-                serializer.save()
+                reactivated = (serializer.validated_data.get('status') in ACTIVE_STATUSES and 
+                               booking.status not in ACTIVE_STATUSES)
+                try:
+                    with transaction.atomic():
+                        if reactivated:
+                            start_date, end_date = booking_dates(booking)
+                            ensure_available(booking.vendor_id, start_date, end_date, 
+                                             exclude_booking_id=booking.id)
+                        serializer.save()
+                except AvailabilityConflict as e:
+                    return Response({'error': str(e), 'conflicts': e.conflicts}, 
+                                  status=status.HTTP_409_CONFLICT)
                 return Response(serializer.data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         else:
             return Response({'error': 'Permission denied'}, 
                           status=status.HTTP_403_FORBIDDEN)
 
+def _message_id_param(value):
+    return int(value) if value else None
+
+def _message_page(booking, page_size, before=None, after=None):
+    """(messages oldest first, has_before, has_after) around a cursor message.
+    
+    Pages seek along booking_message_time_idx, so any page of a thread costs
+    the same however long its history is. Without a cursor the newest page
+    is returned.
+    """
+    messages = BookingMessage.objects.filter(booking=booking).select_related('sender')
+    cursor = before if before is not None else after
+    values = None
+    seek = messages
+    beyond_cursor = False
+    # after=0 pages forward from the oldest message
+    if cursor:
+        anchor = messages.filter(id=cursor).values_list('created_at', 'id').first()
+        if anchor is not None:
+            values = list(anchor)
+            # The cursor message itself lies on the far side of the page
+            beyond_cursor = True
+        else:
+            # The cursor message was deleted: seek on id alone, which grows with created_at
+            if after is not None:
+                seek = messages.filter(id__gt=cursor)
+                beyond_cursor = messages.filter(id__lt=cursor).exists()
+            else:
+                seek = messages.filter(id__lt=cursor)
+                beyond_cursor = messages.filter(id__gt=cursor).exists()
+    
+    if after is not None:
+        rows, has_after = KeysetPaginator(['created_at', 'id'], page_size).page_after(seek, values)
+        return rows, beyond_cursor, has_after
+    
+    rows, has_before = KeysetPaginator(['-created_at', '-id'], page_size).page_after(seek, values)
+    rows.reverse()
+    return rows, has_before, beyond_cursor
+
+def _message_page_links(request, messages, has_before, has_after):
+    """Link header with the older (rel="prev") and newer (rel="next") pages"""
+    url = request.build_absolute_uri()
+    for param in ('before', 'after', 'since'):
+        url = remove_query_param(url, param)
+    links = []
+    if not messages:
+        # An empty page has nothing to anchor on; the client keeps its own cursor
+        return ''
+    if has_before:
+        links.append(f'<{replace_query_param(url, "before", messages[0].id)}>; rel="prev"')
+    if has_after:
+        links.append(f'<{replace_query_param(url, "after", messages[-1].id)}>; rel="next"')
+    return ', '.join(links)
+
 @api_view(['GET', 'POST'])
 @permission_classes([permissions.IsAuthenticated])
 def booking_messages(request, booking_id):
     """Get or create booking messages"""
     try:
-        booking = Booking.objects.get(id=booking_id)
+        booking = Booking.objects.select_related('customer', 'vendor').get(id=booking_id)
     except Booking.DoesNotExist:
         return Response({'error': 'Booking not found'}, 
                        status=status.HTTP_404_NOT_FOUND)
     
     # Check permissions
-    if (booking.customer.user != request.user and 
-        booking.vendor.user != request.user):
+    if (booking.customer.user_id != request.user.id and 
+        booking.vendor.user_id != request.user.id):
         return Response({'error': 'Permission denied'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
     if request.method == 'GET':
-        messages = BookingMessage.objects.filter(booking=booking)
+        try:
+            page_size = min(
+                int(request.GET.get('limit', settings.BOOKING_MESSAGES_PAGE_SIZE)),
+                settings.BOOKING_MESSAGES_MAX_PAGE_SIZE
+            )
+            before = _message_id_param(request.GET.get('before'))
+            # since is the incremental fetch used next to the live stream
+            after = _message_id_param(request.GET.get('after') or request.GET.get('since'))
+        except ValueError:
+            return Response({'error': 'limit, before and after must be numbers'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        if page_size < 1:
+            return Response({'error': 'limit must be positive'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        if before is not None and after is not None:
+            return Response({'error': 'Pass either before or after, not both'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        if (before is not None and before < 1) or (after is not None and after < 0):
+            return Response({'error': 'before must be a positive message id and after not negative'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        messages, has_before, has_after = _message_page(booking, page_size, before, after)
+        
         serializer = BookingMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        response = Response(serializer.data)
+        links = _message_page_links(request, messages, has_before, has_after)
+        if links:
+            response['Link'] = links
+        return response
     
     elif request.method == 'POST':
         serializer = BookingMessageSerializer(data=request.data)
@@ -110,4 +300,151 @@ def booking_messages(request, booking_id):
             message = serializer.save(booking=booking, sender=request.user)
             return Response(BookingMessageSerializer(message).data, 
                           status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+def _stream_user(request):
+    """User from an Authorization header or, for EventSource, a ?token= access token"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    return authentication.get_user(authentication.get_validated_token(raw_token))
+
+def _stream_start(booking_id, user, since):
+    """Last message id the stream starts after, or an (error, status) pair"""
+    booking = Booking.objects.select_related('customer', 'vendor').filter(id=booking_id).first()
+    if booking is None:
+        return None, ('Booking not found', status.HTTP_404_NOT_FOUND)
+    if booking.customer.user_id != user.id and booking.vendor.user_id != user.id:
+        return None, ('Permission denied', status.HTTP_403_FORBIDDEN)
+    if since is not None:
+        return since, None
+    # Without a cursor only messages sent from now on are pushed
+    latest = BookingMessage.objects.filter(booking_id=booking_id).order_by('-id').values_list('id', flat=True).first()
+    return latest or 0, None
+
+def _messages_after(booking_id, last_id):
+    messages = BookingMessage.objects.filter(
+        booking_id=booking_id, id__gt=last_id
+    ).select_related('sender').order_by('id')[:settings.STREAM_CHUNK_SIZE]
+    return BookingMessageSerializer(messages, many=True).data
+
+async def booking_message_stream(request, booking_id):
+    """Push new booking messages as Server-Sent Events (serve under ASGI)"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    
+    try:
+        user = await sync_to_async(_stream_user)(request)
+    except AuthenticationFailed:
+        # Also raised for invalid or expired tokens
+        return JsonResponse({'error': 'Invalid or expired token'}, status=401)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided'}, status=401)
+    
+    # EventSource resends the last id it saw when it reconnects
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return JsonResponse({'error': 'since must be a message id'}, status=400)
+    
+    last_id, error = await sync_to_async(_stream_start)(booking_id, user, since)
+    if error:
+        message, error_status = error
+        return JsonResponse({'error': message}, status=error_status)
+    
+    ensure_listener()
+    response = StreamingHttpResponse(
+        stream_messages(booking_id, last_id, sync_to_async(_messages_after)),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _parse_day(value):
+    day = parse_date(value.strip())
+    if day is None:
+        raise ValueError(f"Invalid date: {value}")
+    return day
+
+def _requested_dates(params):
+    """Dates from ?dates=D1,D2,... or the inclusive ?start=&end= range"""
+    if params.get('dates'):
+        dates = [_parse_day(value) for value in params['dates'].split(',') if value.strip()]
+    elif params.get('start') and params.get('end'):
+        start_date, end_date = _parse_day(params['start']), _parse_day(params['end'])
+        if end_date < start_date:
+            raise ValueError('end must not be before start')
+        dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    else:
+        raise ValueError('Pass dates=YYYY-MM-DD,... or start= and end=')
+    if not dates:
+        raise ValueError('No dates given')
+    if len(dates) > settings.AVAILABILITY_MAX_DAYS:
+        raise ValueError(f"At most {settings.AVAILABILITY_MAX_DAYS} dates can be checked at once")
+    return dates
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def vendor_availability(request, vendor_id):
+    """Whether a vendor is free on each requested date"""
+    try:
+        dates = _requested_dates(request.GET)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not VendorProfile.objects.filter(id=vendor_id).exists():
+        return Response({'error': 'Vendor not found'}, 
+                       status=status.HTTP_404_NOT_FOUND)
+    
+    availability = availability_on_dates(vendor_id, dates)
+    return Response({
+        'vendor_id': vendor_id,
+        'available': all(availability.values()),
+        'dates': [{'date': day, 'available': free} for day, free in availability.items()]
+    })
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def vendor_blackouts(request):
+    """List or add the current vendor's blackout dates"""
+    try:
+        vendor_profile = VendorProfile.objects.get(user=request.user)
+    except VendorProfile.DoesNotExist:
+        return Response({'error': 'Vendor profile not found'}, 
+                      status=status.HTTP_400_BAD_REQUEST)
+    
+    if request.method == 'GET':
+        blackouts = VendorAvailabilityBlock.objects.filter(vendor=vendor_profile, kind='blackout')
+        serializer = BlackoutSerializer(blackouts, many=True)
+        return Response(serializer.data)
+    
+    elif request.method == 'POST':
+        serializer = BlackoutSerializer(data=request.data)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            try:
+                # Blackouts may overlap each other but not active bookings
+                with transaction.atomic():
+                    ensure_available(vendor_profile.id, data['start_date'], data['end_date'], kinds=['booking'])
+                    serializer.save(vendor=vendor_profile, kind='blackout')
+            except AvailabilityConflict as e:
+                return Response({'error': str(e), 'conflicts': e.conflicts}, 
+                              status=status.HTTP_409_CONFLICT)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def delete_vendor_blackout(request, block_id):
+    """Remove one of the current vendor's blackouts"""
+    deleted, _ = VendorAvailabilityBlock.objects.filter(
+        id=block_id, kind='blackout', vendor__user=request.user
+    ).delete()
+    if not deleted:
+        return Response({'error': 'Blackout not found'}, 
+                       status=status.HTTP_404_NOT_FOUND)
+    return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,127 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.urls import reverse
+from event_sathi.versions import bump_version, get_version
+from media_storage.lru import ByteLRU
+from media_storage.utils import without_image_data, image_version, image_data_uri
+from .models import Category, Subcategory, AdminHomepageImages
+
+TREE_VERSION_KEY = 'category_tree:version'
+HOMEPAGE_VERSION_KEY = 'homepage_manifest:version'
+
+# (version, tree, etag) of the last tree this process built or fetched
+_local_tree = None
+# (version, manifest) of the last homepage manifest this process built or fetched
+_local_manifest = None
+
+# Encoded homepage images keyed by (image id, content version)
+homepage_image_cache = ByteLRU(settings.HOMEPAGE_IMAGE_CACHE_MAX_BYTES)
+
+def tree_version():
+    """Current version of the category tree"""
+    return get_version(TREE_VERSION_KEY)
+
+def bump_tree_version():
+    """Invalidate the cached tree in every process"""
+    bump_version(TREE_VERSION_KEY)
+
+def homepage_version():
+    """Current version of the homepage image manifest"""
+    return get_version(HOMEPAGE_VERSION_KEY)
+
+def bump_homepage_version():
+    """Invalidate the cached homepage manifest in every process"""
+    bump_version(HOMEPAGE_VERSION_KEY)
+
+def build_category_tree():
+    """Active categories with their active subcategories, in two queries"""
+    categories = Category.objects.filter(is_active=True).order_by('name').prefetch_related(
+        Prefetch(
+            'subcategories',
+            queryset=Subcategory.objects.filter(is_active=True).order_by('id'),
+            to_attr='active_subcategories'
+        )
+    )
+    return [{
+        'id': category.id,
+        'name': category.name,
+        'description': category.description,
+        'icon': category.icon,
+        'subcategories': [{
+            'id': sub.id,
+            'name': sub.name,
+            'description': sub.description
+        } for sub in category.active_subcategories],
+        'created_at': category.created_at.isoformat()
+    } for category in categories]
+
+def get_category_tree():
+    """Return (tree, etag) from the process-local copy, the shared cache or the database"""
+    global _local_tree
+    version = tree_version()
+    local_tree = _local_tree
+    if local_tree is not None and local_tree[0] == version:
+        return local_tree[1], local_tree[2]
+    
+    key = f'category_tree:{version}'
+    entry = cache.get(key)
+    if entry is None:
+        tree = build_category_tree()
+        # ETag follows the content, so a bump without real changes keeps client caches valid
+        digest = hashlib.sha256(json.dumps(tree, sort_keys=True).encode()).hexdigest()
+        entry = (tree, f'"{digest[:32]}"')
+        cache.set(key, entry, settings.CATEGORY_TREE_CACHE_TIMEOUT)
+    
+    _local_tree = (version, entry[0], entry[1])
+    return entry
+
+def build_homepage_manifest():
+    """Metadata of every active homepage image, without reading any image bytes"""
+    images = without_image_data(
+        AdminHomepageImages.objects.filter(is_active=True)
+    ).order_by('section', 'slot_number')
+    return [{
+        'id': image.id,
+        'section': image.section,
+        'slot_number': image.slot_number,
+        'image_name': image.image_name,
+        'alt_text': image.alt_text,
+        'title': image.title,
+        'description': image.description,
+        'created_at': image.created_at.isoformat(),
+        'image_path': reverse('homepage_image', args=[image.id]),
+        'thumbnail_path': reverse('homepage_image_variant', args=[image.id, settings.LIST_IMAGE_VARIANT]),
+        'image_type': image.image_type,
+        'image_size': image.blob_size,
+        'version': image_version(image)
+    } for image in images]
+
+def get_homepage_manifest():
+    """Return the manifest from the process-local copy, the shared cache or the database"""
+    global _local_manifest
+    version = homepage_version()
+    local_manifest = _local_manifest
+    if local_manifest is not None and local_manifest[0] == version:
+        return local_manifest[1]
+    
+    key = f'homepage_manifest:{version}'
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = build_homepage_manifest()
+        cache.set(key, manifest, settings.HOMEPAGE_MANIFEST_CACHE_TIMEOUT)
+    
+    _local_manifest = (version, manifest)
+    return manifest
+
+def homepage_image_data_uri(entry):
+    """Base64 data URI of a manifest entry, encoded once per content version"""
+    key = (entry['id'], entry['version'])
+    data_uri = homepage_image_cache.get(key)
+    if data_uri is None:
+        image = AdminHomepageImages.objects.get(id=entry['id'])
+        data_uri = image_data_uri(image)
+        homepage_image_cache.set(key, data_uri)
+    return data_uri
@@ -35,7 +35,9 @@ class AdminHomepageImages(models.Model):
     
     section = models.CharField(max_length=20, choices=SECTION_CHOICES)
     slot_number = models.IntegerField()
-    image_data = models.BinaryField()
+    image_data = models.BinaryField(null=True, blank=True)  # Legacy in-table storage
+    blob_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the stored blob
+    image_size = models.PositiveIntegerField(default=0)
     image_name = models.CharField(max_length=255)
     image_type = models.CharField(max_length=50)
     alt_text = models.TextField(blank=True)
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Category, Subcategory, AdminHomepageImages
+from .cache import bump_tree_version, bump_homepage_version
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Subcategory)
+@receiver(post_delete, sender=Subcategory)
+def category_tree_changed(sender, **kwargs):
+    """Invalidate the cached category tree"""
+    # After commit, or a concurrent rebuild could cache the old rows under the new version
+    transaction.on_commit(bump_tree_version)
+
+@receiver(post_save, sender=AdminHomepageImages)
+@receiver(post_delete, sender=AdminHomepageImages)
+def homepage_images_changed(sender, **kwargs):
+    """Rebuild the homepage manifest on next request"""
+    transaction.on_commit(bump_homepage_version)
@@ -0,0 +1,24 @@
+from django.test import TestCase
+from .cache import get_category_tree, tree_version
+from .models import Category
+
+class CategoryTreeCacheTests(TestCase):
+    def test_version_is_bumped_only_on_commit(self):
+        version = tree_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Category.objects.create(name='Photography')
+            self.assertEqual(tree_version(), version)
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(tree_version(), version)
+    
+    def test_tree_is_rebuilt_after_a_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Photography')
+        tree, etag = get_category_tree()
+        self.assertEqual([category['name'] for category in tree], ['Photography'])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Catering')
+        new_tree, new_etag = get_category_tree()
+        self.assertEqual([category['name'] for category in new_tree], ['Catering', 'Photography'])
+        self.assertNotEqual(new_etag, etag)
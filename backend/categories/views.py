@@ -1,10 +1,15 @@
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
-from .models import Category, AdminHomepageImages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from .models import AdminHomepageImages
+from .cache import get_category_tree, get_homepage_manifest, homepage_image_data_uri
+from media_storage.utils import wants_inline_images, store_image_upload
+from media_storage.renditions import schedule_renditions
+from media_storage.uploads import receive_image, UploadRejected
+from media_storage.views import image_response
 import json
-import base64
 from django.core.files.base import ContentFile
 
 @csrf_exempt
@@ -12,27 +17,15 @@ from django.core.files.base import ContentFile
 def category_list(request):
     """Get all categories"""
     try:
-        categories = Category.objects.filter(is_active=True).order_by('name')
+        # Served from cache; the version is bumped by categories.signals
+        category_data, etag = get_category_tree()
         
-        category_data = []
-        for category in categories:
-            subcategories = category.subcategories.filter(is_active=True)
-            subcategory_data = [{
-                'id': sub.id,
-                'name': sub.name,
-                'description': sub.description
-            } for sub in subcategories]
-            
-            category_data.append({
-                'id': category.id,
-                'name': category.name,
-                'description': category.description,
-                'icon': category.icon,
-                'subcategories': subcategory_data,
-                'created_at': category.created_at.isoformat()
-            })
-        
-        return JsonResponse({'categories': category_data})
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse({'categories': category_data})
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
     
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -43,32 +36,39 @@ def homepage_images(request):
     """Get homepage images for hero and carousel"""
     try:
         section = request.GET.get('section', 'all')
+        inline_images = wants_inline_images(request)
         
-        if section == 'all':
-            images = AdminHomepageImages.objects.filter(is_active=True).order_by('section', 'slot_number')
-        else:
-            images = AdminHomepageImages.objects.filter(
-                section=section, 
-                is_active=True
-            ).order_by('slot_number')
-        
+        # The manifest is rebuilt only after AdminHomepageImages changes
         image_data = []
-        for image in images:
-            # Convert binary data to base64 for transmission
-            image_base64 = base64.b64encode(image.image_data).decode('utf-8')
-            image_url = f"data:{image.image_type};base64,{image_base64}"
+        for entry in get_homepage_manifest():
+            if section != 'all' and entry['section'] != section:
+                continue
+            
+            item = {
+                'id': entry['id'],
+                'section': entry['section'],
+                'slot_number': entry['slot_number'],
+                'image_name': entry['image_name'],
+                'alt_text': entry['alt_text'],
+                'title': entry['title'],
+                'description': entry['description'],
+                'created_at': entry['created_at']
+            }
             
-            image_data.append({
-                'id': image.id,
-                'section': image.section,
-                'slot_number': image.slot_number,
-                'image_url': image_url,
-                'image_name': image.image_name,
-                'alt_text': image.alt_text,
-                'title': image.title,
-                'description': image.description,
-                'created_at': image.created_at.isoformat()
-            })
+            if inline_images:
+                # Encoded once per image version and kept in memory
+                item['image_url'] = homepage_image_data_uri(entry)
+            else:
+                url = request.build_absolute_uri(entry['image_path'])
+                item.update({
+                    'image_url': f"{url}?v={entry['version']}",
+                    'image_type': entry['image_type'],
+                    'image_size': entry['image_size'],
+                    'version': entry['version'],
+                    'thumbnail_url': f"{request.build_absolute_uri(entry['thumbnail_path'])}?v={entry['version']}"
+                })
+            
+            image_data.append(item)
         
         return JsonResponse({'images': image_data})
     
@@ -94,24 +94,22 @@ def upload_homepage_image(request):
         if 'image' not in request.FILES:
             return JsonResponse({'error': 'No image file provided'}, status=400)
         
-        image_file = request.FILES['image']
-        
-        # Validate image type
-        allowed_types = ['image/jpeg', 'image/jpg', 'image/png']
-        if image_file.content_type not in allowed_types:
-            return JsonResponse({'error': 'Only JPEG, JPG, and PNG files are allowed'}, status=400)
-        
-        # Read image data
-        image_data = image_file.read()
+        # Spool, sniff and verify the upload, then write it to blob storage
+        with receive_image(request.FILES['image']) as upload:
+            stored = AdminHomepageImages()
+            store_image_upload(stored, upload)
+        schedule_renditions(stored.blob_hash)
         
         # Update or create image record
         image_obj, created = AdminHomepageImages.objects.update_or_create(
             section=section,
             slot_number=slot_number,
             defaults={
-                'image_data': image_data,
-                'image_name': image_file.name,
-                'image_type': image_file.content_type,
+                'image_data': None,
+                'blob_hash': stored.blob_hash,
+                'image_size': stored.image_size,
+                'image_name': upload.name,
+                'image_type': stored.image_type,
                 'title': title,
                 'description': description,
                 'alt_text': alt_text,
@@ -126,6 +124,8 @@ def upload_homepage_image(request):
             'action': 'created' if created else 'updated'
         })
     
+    except UploadRejected as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -134,12 +134,9 @@ def upload_homepage_image(request):
 def download_homepage_image(request, image_id):
     """Download homepage image"""
     try:
-        image = AdminHomepageImages.objects.get(id=image_id, is_active=True)
+        image = AdminHomepageImages.objects.defer('image_data').get(id=image_id, is_active=True)
         
-        response = HttpResponse(image.image_data, content_type=image.image_type)
-        response['Content-Disposition'] = f'attachment; filename="{image.image_name}"'
-        
-        return response
+        return image_response(request, image, as_attachment=True)
     
     except AdminHomepageImages.DoesNotExist:
         return JsonResponse({'error': 'Image not found'}, status=404)
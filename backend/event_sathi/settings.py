@@ -20,6 +20,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -64,6 +65,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'event_sathi.wsgi.application'
+ASGI_APPLICATION = 'event_sathi.asgi.application'
 
 DATABASES = {
     'default': {
@@ -81,6 +83,18 @@ DATABASES = {
 
 # Remove MongoDB settings as we're using Supabase PostgreSQL for everything
 
+# Use a shared cache (e.g. CACHE_URL=redis://...) when running several workers,
+# otherwise cache invalidation only reaches the process that made the change
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+VENDOR_DETAIL_CACHE_TIMEOUT = env.int('VENDOR_DETAIL_CACHE_TIMEOUT', default=15 * 60)
+CATEGORY_TREE_CACHE_TIMEOUT = env.int('CATEGORY_TREE_CACHE_TIMEOUT', default=24 * 60 * 60)
+HOMEPAGE_MANIFEST_CACHE_TIMEOUT = env.int('HOMEPAGE_MANIFEST_CACHE_TIMEOUT', default=24 * 60 * 60)
+# Per-process budget for base64-encoded homepage images
+HOMEPAGE_IMAGE_CACHE_MAX_BYTES = env.int('HOMEPAGE_IMAGE_CACHE_MAX_BYTES', default=32 * 1024 * 1024)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -107,6 +121,24 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Image blobs are stored outside the database, addressed by SHA-256 digest
+IMAGE_BLOB_STORAGE = env('IMAGE_BLOB_STORAGE', default='media_storage.storage.FileSystemBlobStorage')
+IMAGE_BLOB_ROOT = os.path.join(MEDIA_ROOT, 'blobs')
+
+# Image uploads are spooled to disk and decoded in a bounded process pool
+IMAGE_UPLOAD_MAX_SIZE = env.int('IMAGE_UPLOAD_MAX_SIZE', default=10 * 1024 * 1024)
+IMAGE_UPLOAD_MAX_PIXELS = env.int('IMAGE_UPLOAD_MAX_PIXELS', default=40_000_000)
+IMAGE_VERIFY_WORKERS = env.int('IMAGE_VERIFY_WORKERS', default=2)
+IMAGE_VERIFY_TIMEOUT = env.int('IMAGE_VERIFY_TIMEOUT', default=30)
+VENDOR_BULK_UPLOAD_MAX_FILES = 200
+DATA_UPLOAD_MAX_NUMBER_FILES = VENDOR_BULK_UPLOAD_MAX_FILES
+
+# Resized renditions generated in the background after each upload
+IMAGE_RENDITION_WORKERS = env.int('IMAGE_RENDITION_WORKERS', default=2)
+IMAGE_RENDITION_TIMEOUT = env.int('IMAGE_RENDITION_TIMEOUT', default=120)
+# Rendition list endpoints link to unless ?image_variant= says otherwise
+LIST_IMAGE_VARIANT = 'thumb.webp'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
@@ -120,6 +152,33 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20
 }
 
+# Keyset pagination for the public vendor catalog
+VENDOR_LIST_PAGE_SIZE = 20
+VENDOR_LIST_MAX_PAGE_SIZE = 100
+VENDOR_NEAR_DEFAULT_RADIUS_KM = 25
+VENDOR_NEAR_MAX_RADIUS_KM = 500
+# Pincode centroids read by load_pincodes: the bundled metro sample by default, point it
+# at the full India Post pincode directory CSV to geocode every vendor
+PINCODE_DATASET = env('PINCODE_DATASET', default=str(BASE_DIR / 'vendors' / 'data' / 'pincodes.csv'))
+
+# Longest list of dates one availability query may check
+AVAILABILITY_MAX_DAYS = 366
+
+# Keyset pages of booking message history
+BOOKING_MESSAGES_PAGE_SIZE = 50
+BOOKING_MESSAGES_MAX_PAGE_SIZE = 200
+
+# Booking chat Server-Sent Events; serve them through event_sathi.asgi
+BOOKING_CHAT_HEARTBEAT_SECONDS = 15
+BOOKING_CHAT_STREAM_SECONDS = 5 * 60
+BOOKING_CHAT_RETRY_MS = 3000
+# Fan out new messages across processes with Postgres LISTEN/NOTIFY. LISTEN needs a
+# session connection, so point DATABASES at a direct or session-mode pooler port
+BOOKING_CHAT_PG_NOTIFY = env.bool('BOOKING_CHAT_PG_NOTIFY', default=False)
+
+# Rows fetched per database round trip by streamed list responses
+STREAM_CHUNK_SIZE = 500
+
 # JWT Settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -137,6 +196,9 @@ CORS_ALLOWED_ORIGINS = [
     "https://026bf7d1-0d8a-4c9b-9693-26a3281c5954.lovableproject.com",
 ]
 
+# Let browser clients read the message history page links
+CORS_EXPOSE_HEADERS = ['Link']
+
 # Allow all origins in development
 CORS_ALLOW_ALL_ORIGINS = DEBUG
 
@@ -0,0 +1,66 @@
+import json
+from itertools import chain, islice
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+def wants_streaming(request):
+    """Check whether the client asked for a streamed JSON array"""
+    return request.GET.get('stream', 'false').lower() == 'true'
+
+def iter_queryset(queryset, chunk_size=None):
+    """Iterate a queryset chunk by chunk without caching its rows.
+    
+    Each chunk is its own query seeking past the last row of the previous
+    one, so no server-side cursor has to survive between statements (a
+    transaction-mode pooler may run every FETCH on another connection).
+    The queryset's ordering is kept, with id appended as a tie-breaker.
+    """
+    from vendors.pagination import KeysetPaginator
+    
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if not ordering or ordering[-1].lstrip('-') not in ('id', 'pk'):
+        ordering.append('-id' if ordering and ordering[-1].startswith('-') else 'id')
+    paginator = KeysetPaginator(ordering, chunk_size or settings.STREAM_CHUNK_SIZE)
+    
+    values = None
+    while True:
+        rows, has_more = paginator.page_after(queryset, values)
+        yield from rows
+        if not has_more:
+            return
+        values = [getattr(rows[-1], field) for field in paginator.fields]
+
+def iter_chunks(iterable, size):
+    """Group an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_json_array(items, encoder=DjangoJSONEncoder):
+    """Encode items as a JSON array one element at a time"""
+    yield '['
+    for index, item in enumerate(items):
+        if index:
+            yield ','
+        yield json.dumps(item, cls=encoder)
+    yield ']'
+
+def streaming_json_response(items, encoder=DjangoJSONEncoder):
+    """Stream items as a JSON array so memory stays bounded by one chunk.
+    
+    The first element is produced before the response is returned, so a
+    failing query or serializer still raises in the view instead of
+    truncating a 200 body.
+    """
+    chunks = iter_json_array(items, encoder=encoder)
+    head = [next(chunks), next(chunks)]
+    response = StreamingHttpResponse(
+        chain(head, chunks),
+        content_type='application/json'
+    )
+    response['X-Accel-Buffering'] = 'no'
+    return response
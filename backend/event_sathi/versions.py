@@ -0,0 +1,18 @@
+import time
+from django.core.cache import cache
+
+def get_version(key):
+    """Current value of a version counter shared by every process"""
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock so an evicted version never reuses an old payload key
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+def bump_version(key):
+    """Move a version counter on, so payloads cached under the old value are never read"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
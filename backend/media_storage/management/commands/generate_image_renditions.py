@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from vendors.models import VendorCategoryImages
+from categories.models import AdminHomepageImages
+from media_storage.models import ImageRendition
+from media_storage.renditions import VARIANTS, generate_renditions
+
+class Command(BaseCommand):
+    help = 'Generate missing resized renditions for every stored image blob'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many images lack renditions')
+    
+    def handle(self, *args, **options):
+        source_hashes = set()
+        for model in (VendorCategoryImages, AdminHomepageImages):
+            source_hashes.update(
+                model.objects.exclude(blob_hash='').values_list('blob_hash', flat=True).distinct()
+            )
+        
+        # Blobs that already have every variant are skipped without touching them
+        complete = set(
+            ImageRendition.objects.values('source_hash').annotate(variants=Count('id'))
+            .filter(variants__gte=len(VARIANTS)).values_list('source_hash', flat=True)
+        )
+        pending = sorted(source_hashes - complete)
+        
+        if options['dry_run']:
+            self.stdout.write(f"{len(pending)} images lack renditions")
+            return
+        
+        created = 0
+        for source_hash in pending:
+            try:
+                created += generate_renditions(source_hash)
+            except Exception as e:
+                self.stderr.write(f"{source_hash}: {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} renditions for {len(pending)} images ({len(VARIANTS)} variants each)"
+        ))
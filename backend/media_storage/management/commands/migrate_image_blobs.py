@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from vendors.models import VendorCategoryImages
+from categories.models import AdminHomepageImages
+from media_storage.storage import get_blob_storage
+from vendors.cache import bump_detail_version
+from categories.cache import bump_homepage_version
+
+class Command(BaseCommand):
+    help = 'Move image bytes from BinaryField columns into the blob storage'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20,
+                            help='Number of blobs held in memory at a time')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many images would be moved')
+    
+    def handle(self, *args, **options):
+        storage = get_blob_storage()
+        batch_size = options['batch_size']
+        
+        for model in (VendorCategoryImages, AdminHomepageImages):
+            pending_ids = list(
+                model.objects.filter(blob_hash='', image_data__isnull=False)
+                .order_by('id').values_list('id', flat=True)
+            )
+            
+            if options['dry_run']:
+                self.stdout.write(f"{model.__name__}: {len(pending_ids)} images to move")
+                continue
+            
+            moved_bytes = 0
+            vendor_ids = set()
+            fields = ['id', 'image_data'] + (['vendor_id'] if model is VendorCategoryImages else [])
+            for start in range(0, len(pending_ids), batch_size):
+                batch = model.objects.filter(id__in=pending_ids[start:start + batch_size]).only(*fields)
+                for image in batch:
+                    content = bytes(image.image_data)
+                    digest = storage.save(content)
+                    
+                    # Image versions become the blob hash, so every moved image gets a new URL and ETag
+                    model.objects.filter(id=image.id).update(
+                        blob_hash=digest,
+                        image_size=len(content),
+                        image_data=None
+                    )
+                    moved_bytes += len(content)
+                    if model is VendorCategoryImages:
+                        vendor_ids.add(image.vendor_id)
+            
+            # Cached payloads still carry the old image URLs
+            for vendor_id in vendor_ids:
+                bump_detail_version(vendor_id)
+            if model is AdminHomepageImages and pending_ids:
+                bump_homepage_version()
+            
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__}: moved {len(pending_ids)} images ({moved_bytes} bytes)"
+            ))
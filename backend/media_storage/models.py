@@ -0,0 +1,26 @@
+from django.db import models
+
+class ImageRendition(models.Model):
+    """Resized copy of an image blob, shared by every record with the same source content"""
+    source_hash = models.CharField(max_length=64)  # blob_hash of the original upload
+    variant = models.CharField(max_length=20)  # e.g. 'thumb.webp', see media_storage.renditions
+    blob_hash = models.CharField(max_length=64)
+    image_type = models.CharField(max_length=50)
+    image_size = models.PositiveIntegerField(default=0)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['source_hash', 'variant']
+    
+    # Attributes image_response expects from image records
+    image_data = None
+    
+    @property
+    def image_name(self):
+        return self.variant
+    
+    @property
+    def updated_at(self):
+        return self.created_at
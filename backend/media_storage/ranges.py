@@ -0,0 +1,134 @@
+import os
+import re
+import secrets
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_http_date_safe
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+# Requests asking for more ranges than this get the full body instead
+MAX_RANGES = 16
+
+_RANGE_SPEC = re.compile(r'^(\d*)-(\d*)$')
+
+def parse_range_header(header, size):
+    """Parse a bytes Range header into inclusive (start, end) pairs.
+    
+    Returns None when the header should be ignored (bad syntax or too many
+    ranges) and an empty list when no range can be satisfied.
+    """
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not specs:
+        return None
+    
+    ranges = []
+    for spec in specs.split(','):
+        match = _RANGE_SPEC.match(spec.strip())
+        if not match or match.groups() == ('', ''):
+            return None
+        
+        first, last = match.groups()
+        if first == '':
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                continue
+            ranges.append((max(size - length, 0), size - 1))
+            continue
+        
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            continue
+        end = min(int(last), size - 1) if last else size - 1
+        ranges.append((start, end))
+    
+    if len(ranges) > MAX_RANGES:
+        return None
+    return ranges
+
+def if_range_passes(request, etag, last_modified):
+    """Check the If-Range precondition; a failed check means serve the full body"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    
+    if_range = if_range.strip()
+    if if_range.startswith(('"', 'W/')):
+        # Strong comparison only, weak tags never match
+        return if_range == etag
+    modified = parse_http_date_safe(if_range)
+    return modified is not None and modified == last_modified
+
+def iter_blob_range(blob, start, end, chunk_size=RANGE_CHUNK_SIZE):
+    """Read bytes start..end (inclusive) from an open blob in chunks"""
+    blob.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = blob.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+def _iter_multipart(blob, ranges, size, content_type, boundary):
+    try:
+        for start, end in ranges:
+            yield _part_header(boundary, content_type, start, end, size)
+            yield from iter_blob_range(blob, start, end)
+            yield b'\r\n'
+        yield f'--{boundary}--\r\n'.encode()
+    finally:
+        blob.close()
+
+def _iter_single(blob, start, end):
+    try:
+        yield from iter_blob_range(blob, start, end)
+    finally:
+        blob.close()
+
+def _part_header(boundary, content_type, start, end, size):
+    return (
+        f'--{boundary}\r\n'
+        f'Content-Type: {content_type}\r\n'
+        f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+    ).encode()
+
+def range_response(request, blob, content_type):
+    """Build a 206/416 response for the request's Range header.
+    
+    Returns None (leaving the blob open) when the full body should be sent.
+    """
+    blob.seek(0, os.SEEK_END)
+    size = blob.tell()
+    
+    ranges = parse_range_header(request.META['HTTP_RANGE'], size)
+    if ranges is None:
+        return None
+    
+    if not ranges:
+        blob.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        response = StreamingHttpResponse(_iter_single(blob, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+        return response
+    
+    boundary = secrets.token_hex(16)
+    content_length = sum(
+        len(_part_header(boundary, content_type, start, end, size)) + (end - start + 1) + 2
+        for start, end in ranges
+    ) + len(f'--{boundary}--\r\n')
+    response = StreamingHttpResponse(
+        _iter_multipart(blob, ranges, size, content_type, boundary),
+        status=206,
+        content_type=f'multipart/byteranges; boundary={boundary}'
+    )
+    response['Content-Length'] = str(content_length)
+    return response
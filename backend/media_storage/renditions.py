@@ -0,0 +1,150 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from .models import ImageRendition
+from .storage import get_blob_storage
+
+logger = logging.getLogger(__name__)
+
+# Target width in pixels per size name; images are never upscaled
+RENDITION_SIZES = {'thumb': 320, 'medium': 768, 'large': 1600}
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+VARIANTS = [f"{size}.{image_format}" for size in RENDITION_SIZES for image_format in RENDITION_FORMATS]
+
+def variant_spec(variant):
+    """(width, Pillow format, content type) of a variant name such as 'thumb.webp'"""
+    size, _, image_format = variant.partition('.')
+    return (RENDITION_SIZES[size],) + RENDITION_FORMATS[image_format]
+
+def _render_variants(path, specs):
+    """Resize and encode one source image into every requested variant (worker process)"""
+    import io
+    from PIL import Image, ImageOps
+    
+    results = []
+    with Image.open(path) as original:
+        # Apply the EXIF orientation so phone photos are not rendered sideways
+        source = ImageOps.exif_transpose(original)
+        source.load()
+        for variant, width, pillow_format in specs:
+            image = source.copy()
+            image.thumbnail((width, image.height), Image.LANCZOS)
+            
+            if pillow_format == 'JPEG':
+                if image.mode in ('RGBA', 'LA', 'P'):
+                    image = image.convert('RGBA')
+                    background = Image.new('RGB', image.size, (255, 255, 255))
+                    background.paste(image, mask=image.getchannel('A'))
+                    image = background
+                elif image.mode != 'RGB':
+                    image = image.convert('RGB')
+                options = {'quality': 82, 'optimize': True, 'progressive': True}
+            else:
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA' if image.mode in ('LA', 'P', 'PA') else 'RGB')
+                options = {'quality': 80, 'method': 4}
+            
+            output = io.BytesIO()
+            image.save(output, pillow_format, **options)
+            results.append((variant, output.getvalue(), image.width, image.height))
+    return results
+
+@contextmanager
+def local_blob_path(digest):
+    """Filesystem path of a blob, copied to a temporary file if the storage is remote"""
+    storage = get_blob_storage()
+    if hasattr(storage, 'path'):
+        yield storage.path(digest)
+        return
+    
+    fd, path = tempfile.mkstemp(prefix='rendition-')
+    try:
+        with os.fdopen(fd, 'wb') as local_file, storage.open(digest) as blob:
+            shutil.copyfileobj(blob, local_file)
+        yield path
+    finally:
+        os.unlink(path)
+
+_rendition_pool = None
+_dispatcher = None
+_pool_lock = threading.Lock()
+
+def get_rendition_pool():
+    """Process pool that decodes and encodes images, bounded by IMAGE_RENDITION_WORKERS"""
+    global _rendition_pool
+    with _pool_lock:
+        if _rendition_pool is None:
+            # Workers start from a fresh interpreter, not a fork of the threaded server;
+            # importing this module there needs the app registry
+            _rendition_pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS,
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=django.setup
+            )
+        return _rendition_pool
+
+def _get_dispatcher():
+    # One background thread per process queues sources for the pool
+    global _dispatcher
+    with _pool_lock:
+        if _dispatcher is None:
+            _dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='renditions')
+        return _dispatcher
+
+def generate_renditions(source_hash):
+    """Create the missing renditions of a blob and return how many were made"""
+    existing = set(
+        ImageRendition.objects.filter(source_hash=source_hash).values_list('variant', flat=True)
+    )
+    specs = [(variant,) + variant_spec(variant)[:2] for variant in VARIANTS if variant not in existing]
+    if not specs:
+        return 0
+    
+    with local_blob_path(source_hash) as path:
+        results = get_rendition_pool().submit(_render_variants, path, specs).result(
+            timeout=settings.IMAGE_RENDITION_TIMEOUT
+        )
+    
+    storage = get_blob_storage()
+    renditions = [ImageRendition(
+        source_hash=source_hash,
+        variant=variant,
+        blob_hash=storage.save(content),
+        image_type=variant_spec(variant)[2],
+        image_size=len(content),
+        width=width,
+        height=height
+    ) for variant, content, width, height in results]
+    # Another process may have rendered the same content concurrently
+    ImageRendition.objects.bulk_create(renditions, ignore_conflicts=True)
+    return len(renditions)
+
+def _generate_in_background(source_hash):
+    try:
+        generate_renditions(source_hash)
+    except Exception:
+        logger.exception('Could not generate renditions of blob %s', source_hash)
+    finally:
+        connection.close()
+
+def schedule_renditions(source_hash):
+    """Generate renditions in the background once the current transaction commits"""
+    if not source_hash:
+        return
+    transaction.on_commit(lambda: _get_dispatcher().submit(_generate_in_background, source_hash))
+
+def get_rendition(source_hash, variant):
+    if not source_hash:
+        return None
+    return ImageRendition.objects.filter(source_hash=source_hash, variant=variant).first()
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+class BlobStorage:
+    """Content-addressed storage for image blobs, keyed by SHA-256 hex digest"""
+    
+    def save(self, content):
+        """Store bytes and return their digest"""
+        raise NotImplementedError
+    
+    def save_file(self, path, digest):
+        """Store a local file whose SHA-256 digest is already known"""
+        raise NotImplementedError
+    
+    def open(self, digest):
+        """Open a stored blob for binary reading"""
+        raise NotImplementedError
+    
+    def exists(self, digest):
+        raise NotImplementedError
+    
+    def delete(self, digest):
+        raise NotImplementedError
+
+class FileSystemBlobStorage(BlobStorage):
+    """Stores blobs as files in a two-level directory tree, e.g. ab/cd/abcd..."""
+    
+    def __init__(self, location=None):
+        self.location = location or settings.IMAGE_BLOB_ROOT
+    
+    def path(self, digest):
+        return os.path.join(self.location, digest[:2], digest[2:4], digest)
+    
+    def save(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.path(digest)
+        
+        # Identical content is only written once
+        if not os.path.exists(path):
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory)
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    temp_file.write(content)
+                os.replace(temp_path, path)
+            except Exception:
+                os.unlink(temp_path)
+                raise
+        
+        return digest
+    
+    def save_file(self, path, digest):
+        target = self.path(digest)
+        if not os.path.exists(target):
+            directory = os.path.dirname(target)
+            os.makedirs(directory, exist_ok=True)
+            # Copy next to the target first so the final rename is atomic
+            fd, temp_path = tempfile.mkstemp(dir=directory)
+            os.close(fd)
+            try:
+                shutil.copyfile(path, temp_path)
+                os.replace(temp_path, target)
+            except Exception:
+                os.unlink(temp_path)
+                raise
+        
+        return digest
+    
+    def open(self, digest):
+        return open(self.path(digest), 'rb')
+    
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+    
+    def delete(self, digest):
+        try:
+            os.unlink(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+_blob_storage = None
+
+def get_blob_storage():
+    """Get the blob storage backend configured by IMAGE_BLOB_STORAGE"""
+    global _blob_storage
+    if _blob_storage is None:
+        _blob_storage = import_string(settings.IMAGE_BLOB_STORAGE)()
+    return _blob_storage
@@ -0,0 +1,112 @@
+import io
+import tempfile
+from unittest import mock
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from accounts.models import User, VendorProfile
+from categories.cache import homepage_version
+from categories.models import AdminHomepageImages
+from vendors.cache import detail_version
+from vendors.models import VendorCategoryImages
+from . import storage
+from .ranges import MAX_RANGES, if_range_passes, parse_range_header, range_response
+
+class ParseRangeHeaderTests(SimpleTestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_range_header('bytes=0-99', 1000), [(0, 99)])
+        self.assertEqual(parse_range_header('bytes=900-', 1000), [(900, 999)])
+        self.assertEqual(parse_range_header('bytes=-100', 1000), [(900, 999)])
+    
+    def test_end_is_clamped_to_the_size(self):
+        self.assertEqual(parse_range_header('bytes=500-5000', 1000), [(500, 999)])
+        self.assertEqual(parse_range_header('bytes=-5000', 1000), [(0, 999)])
+    
+    def test_multiple_ranges(self):
+        self.assertEqual(parse_range_header('bytes=0-9, 20-29,-5', 100), [(0, 9), (20, 29), (95, 99)])
+    
+    def test_unsatisfiable_ranges_are_dropped(self):
+        self.assertEqual(parse_range_header('bytes=1000-', 1000), [])
+        self.assertEqual(parse_range_header('bytes=-0', 1000), [])
+        self.assertEqual(parse_range_header('bytes=2000-3000,0-1', 1000), [(0, 1)])
+    
+    def test_invalid_headers_are_ignored(self):
+        for header in ['items=0-1', 'bytes=', 'bytes=-', 'bytes=abc', 'bytes=10-5', 'bytes=0-1;2-3']:
+            self.assertIsNone(parse_range_header(header, 1000), header)
+    
+    def test_too_many_ranges_are_ignored(self):
+        header = 'bytes=' + ','.join(f'{n}-{n}' for n in range(MAX_RANGES + 1))
+        self.assertIsNone(parse_range_header(header, 1000))
+
+class RangeResponseTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.content = bytes(range(256)) * 4
+    
+    def respond(self, header):
+        request = self.factory.get('/', HTTP_RANGE=header)
+        return range_response(request, io.BytesIO(self.content), 'image/png')
+    
+    def test_single_range(self):
+        response = self.respond('bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+    
+    def test_multiple_ranges_have_an_exact_content_length(self):
+        response = self.respond('bytes=0-1,-2')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response['Content-Type'].startswith('multipart/byteranges; boundary='))
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertIn(b'Content-Range: bytes 1022-1023/1024', body)
+    
+    def test_unsatisfiable_range(self):
+        response = self.respond('bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+    
+    def test_invalid_range_serves_the_full_body(self):
+        self.assertIsNone(self.respond('bytes=9-1'))
+
+class IfRangeTests(SimpleTestCase):
+    def test_strong_etag_must_match(self):
+        factory = RequestFactory()
+        self.assertTrue(if_range_passes(factory.get('/', HTTP_IF_RANGE='"abc"'), '"abc"', None))
+        self.assertFalse(if_range_passes(factory.get('/', HTTP_IF_RANGE='"old"'), '"abc"', None))
+        self.assertFalse(if_range_passes(factory.get('/', HTTP_IF_RANGE='W/"abc"'), '"abc"', None))
+        self.assertTrue(if_range_passes(factory.get('/'), '"abc"', None))
+    
+    def test_date_must_match_last_modified(self):
+        factory = RequestFactory()
+        date = 'Wed, 21 Oct 2015 07:28:00 GMT'
+        self.assertTrue(if_range_passes(factory.get('/', HTTP_IF_RANGE=date), '"abc"', 1445412480))
+        self.assertFalse(if_range_passes(factory.get('/', HTTP_IF_RANGE=date), '"abc"', 1445412481))
+        self.assertFalse(if_range_passes(factory.get('/', HTTP_IF_RANGE='garbage'), '"abc"', None))
+
+class MigrateImageBlobsTests(TestCase):
+    def test_moved_images_invalidate_cached_payloads(self):
+        user = User.objects.create(username='vendor', email='vendor@example.com', user_type='vendor')
+        vendor = VendorProfile.objects.create(
+            user=user, business_name='Vendor', aadhaar_number='a1', pan_number='p1',
+            address='MG Road', city='Pune', state='Maharashtra', pincode='411001'
+        )
+        image = VendorCategoryImages.objects.create(
+            vendor=vendor, category_name='Photography', image_name='a.jpg', image_type='image/jpeg',
+            image_order=0, image_data=b'vendor image'
+        )
+        homepage_image = AdminHomepageImages.objects.create(
+            section='hero', slot_number=1, image_name='b.jpg', image_type='image/jpeg', image_data=b'homepage image'
+        )
+        versions = (detail_version(vendor.id), homepage_version())
+        
+        with tempfile.TemporaryDirectory() as location:
+            with mock.patch.object(storage, '_blob_storage', storage.FileSystemBlobStorage(location)):
+                call_command('migrate_image_blobs', stdout=io.StringIO())
+        
+        image.refresh_from_db()
+        homepage_image.refresh_from_db()
+        self.assertEqual(len(image.blob_hash), 64)
+        self.assertIsNone(image.image_data)
+        self.assertEqual(len(homepage_image.blob_hash), 64)
+        self.assertNotEqual(detail_version(vendor.id), versions[0])
+        self.assertNotEqual(homepage_version(), versions[1])
@@ -0,0 +1,195 @@
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of each accepted format
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+]
+SIGNATURE_LENGTH = max(len(signature) for signature, _ in IMAGE_SIGNATURES)
+
+# Pillow format names for the accepted content types
+PILLOW_FORMATS = {'image/jpeg': 'JPEG', 'image/png': 'PNG'}
+
+class UploadRejected(ValueError):
+    pass
+
+def sniff_image_type(header):
+    """Content type from the file's magic bytes, or None if not an accepted image"""
+    for signature, content_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+class SpooledUpload:
+    """An upload copied to a temporary file, hashed and sniffed on the way"""
+    
+    def __init__(self, name, path, digest, size, content_type):
+        self.name = name
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.content_type = content_type
+        # Filled in once the image has been verified
+        self.width = None
+        self.height = None
+    
+    def close(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _too_large(max_size):
+    limit = filesizeformat(max_size).replace('\xa0', ' ')
+    return UploadRejected(f"Image is larger than {limit}")
+
+def spool_upload(uploaded_file, max_size=None):
+    """Copy an upload to a spool file chunk by chunk, hashing it on the fly.
+    
+    Memory use is bounded by UPLOAD_CHUNK_SIZE whatever the file size; the
+    upload is rejected as soon as it passes max_size.
+    """
+    max_size = max_size or settings.IMAGE_UPLOAD_MAX_SIZE
+    if uploaded_file.size and uploaded_file.size > max_size:
+        raise _too_large(max_size)
+    
+    digest = hashlib.sha256()
+    size = 0
+    header = b''
+    fd, path = tempfile.mkstemp(prefix='upload-', dir=settings.FILE_UPLOAD_TEMP_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as spool:
+            for chunk in uploaded_file.chunks(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(max_size)
+                if len(header) < SIGNATURE_LENGTH:
+                    header += chunk[:SIGNATURE_LENGTH - len(header)]
+                digest.update(chunk)
+                spool.write(chunk)
+        
+        # The client's content_type is ignored, only the bytes are trusted
+        content_type = sniff_image_type(header)
+        if content_type is None:
+            raise UploadRejected('Only JPEG, JPG, and PNG files are allowed')
+    except Exception:
+        os.unlink(path)
+        raise
+    
+    return SpooledUpload(uploaded_file.name, path, digest.hexdigest(), size, content_type)
+
+def _verify_image_file(path):
+    """Check an image's structure in a worker process, return (format, width, height)"""
+    from PIL import Image
+    
+    # Dimensions are checked by the caller; verify() never allocates the pixels
+    Image.MAX_IMAGE_PIXELS = None
+    with Image.open(path) as image:
+        image.verify()
+        return image.format, image.width, image.height
+
+_verification_pool = None
+_verification_pool_lock = threading.Lock()
+
+def get_verification_pool():
+    """Process pool shared by all requests, bounded by IMAGE_VERIFY_WORKERS"""
+    global _verification_pool
+    with _verification_pool_lock:
+        if _verification_pool is None:
+            # Forking a threaded server process can copy held locks into the child
+            _verification_pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VERIFY_WORKERS,
+                mp_context=multiprocessing.get_context('forkserver')
+            )
+        return _verification_pool
+
+def _reset_verification_pool(pool):
+    global _verification_pool
+    with _verification_pool_lock:
+        if _verification_pool is pool:
+            _verification_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def submit_verification(upload):
+    """Start decoding a spooled upload in the verification pool"""
+    pool = get_verification_pool()
+    try:
+        return pool.submit(_verify_image_file, upload.path)
+    except BrokenProcessPool:
+        _reset_verification_pool(pool)
+        return get_verification_pool().submit(_verify_image_file, upload.path)
+
+def check_verification(upload, future):
+    """Wait for a verification started by submit_verification"""
+    try:
+        image_format, width, height = future.result(timeout=settings.IMAGE_VERIFY_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        raise UploadRejected('Image could not be verified in time')
+    except BrokenProcessPool:
+        # A worker died while decoding; the next submit replaces the pool
+        raise UploadRejected('Image could not be verified')
+    except Exception:
+        raise UploadRejected('File is not a valid image')
+    
+    if image_format != PILLOW_FORMATS[upload.content_type]:
+        raise UploadRejected('File is not a valid image')
+    if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise UploadRejected('Image dimensions are too large')
+    upload.width = width
+    upload.height = height
+
+def receive_image(uploaded_file, max_size=None):
+    """Spool, size-check, sniff and verify an uploaded image.
+    
+    Returns a SpooledUpload the caller must close, or raises UploadRejected.
+    """
+    upload = spool_upload(uploaded_file, max_size=max_size)
+    try:
+        check_verification(upload, submit_verification(upload))
+    except Exception:
+        upload.close()
+        raise
+    return upload
+
+def receive_images(uploaded_files, max_size=None):
+    """Like receive_image for many files, verifying them in parallel.
+    
+    Returns (uploads, errors): the accepted SpooledUploads, which the caller
+    must close, and a (file name, message) pair for every rejected file.
+    """
+    spooled = []
+    errors = []
+    for uploaded_file in uploaded_files:
+        try:
+            spooled.append(spool_upload(uploaded_file, max_size=max_size))
+        except UploadRejected as e:
+            errors.append((uploaded_file.name, str(e)))
+    
+    # Every file is decoded concurrently, bounded by the pool size
+    pending = [(upload, submit_verification(upload)) for upload in spooled]
+    uploads = []
+    for upload, future in pending:
+        try:
+            check_verification(upload, future)
+            uploads.append(upload)
+        except UploadRejected as e:
+            upload.close()
+            errors.append((upload.name, str(e)))
+    return uploads, errors
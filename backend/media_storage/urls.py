@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('vendor-images/<int:image_id>/', views.vendor_category_image, name='vendor_category_image'),
+    path('homepage-images/<int:image_id>/', views.homepage_image, name='homepage_image'),
+    path('vendor-images/<int:image_id>/<str:variant>/', views.vendor_category_image_variant,
+         name='vendor_category_image_variant'),
+    path('homepage-images/<int:image_id>/<str:variant>/', views.homepage_image_variant,
+         name='homepage_image_variant'),
+]
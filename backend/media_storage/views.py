@@ -0,0 +1,136 @@
+from django.http import JsonResponse, HttpResponse, HttpResponseRedirect, FileResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from django.db.models import Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from vendors.models import VendorCategoryImages
+from categories.models import AdminHomepageImages
+from .storage import get_blob_storage
+from .utils import image_etag, image_version, open_image_content
+from .ranges import range_response, if_range_passes
+from .renditions import VARIANTS, get_rendition
+
+# Versioned URLs never change content, so they can be cached for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+def image_body_response(image, as_attachment=False):
+    """Raw image bytes for use in <img> tags or downloads"""
+    if image.blob_hash:
+        # FileResponse lets the server use sendfile instead of copying through Python
+        return FileResponse(
+            get_blob_storage().open(image.blob_hash),
+            content_type=image.image_type,
+            as_attachment=as_attachment,
+            filename=image.image_name
+        )
+    
+    disposition = 'attachment' if as_attachment else 'inline'
+    response = HttpResponse(image.image_data, content_type=image.image_type)
+    response['Content-Disposition'] = f'{disposition}; filename="{image.image_name}"'
+    return response
+
+def image_response(request, image, as_attachment=False, public=True, version=None):
+    """Serve an image with validators, answering conditional requests with 304"""
+    etag = image_etag(image)
+    last_modified = int(image.updated_at.timestamp())
+    
+    # Evaluated before touching the blob, so revalidation never reads image bytes
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    
+    if (response is None and 'HTTP_RANGE' in request.META
+            and if_range_passes(request, etag, last_modified)):
+        blob = open_image_content(image)
+        response = range_response(request, blob, image.image_type)
+        if response is None:
+            blob.close()
+    
+    if response is None:
+        response = image_body_response(image, as_attachment=as_attachment)
+    
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    visibility = {'public': True} if public else {'private': True}
+    if request.GET.get('v') == (version or image_version(image)):
+        patch_cache_control(response, max_age=IMMUTABLE_MAX_AGE, immutable=True, **visibility)
+    else:
+        patch_cache_control(response, no_cache=True, **visibility)
+    return response
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def vendor_category_image(request, image_id):
+    """Serve a vendor category image"""
+    try:
+        # Images of unverified vendors are only visible to the vendor itself
+        image = VendorCategoryImages.objects.select_related('vendor').defer('image_data').get(
+            Q(vendor__is_verified=True) | Q(vendor__user_id=request.user.id),
+            id=image_id
+        )
+        return image_response(request, image, public=image.vendor.is_verified)
+    
+    except VendorCategoryImages.DoesNotExist:
+        return JsonResponse({'error': 'Image not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def homepage_image(request, image_id):
+    """Serve a homepage image"""
+    try:
+        image = AdminHomepageImages.objects.defer('image_data').get(id=image_id, is_active=True)
+        return image_response(request, image)
+    
+    except AdminHomepageImages.DoesNotExist:
+        return JsonResponse({'error': 'Image not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def variant_response(request, image, variant, url_name, public=True):
+    """Serve a rendition of an image, or redirect to the original until it exists"""
+    if variant not in VARIANTS:
+        return JsonResponse({'error': 'Unknown image variant'}, status=404)
+    
+    version = image_version(image)
+    rendition = get_rendition(image.blob_hash, variant)
+    if rendition is None:
+        # Still being generated, or a legacy row without a blob
+        url = reverse(url_name, args=[image.id])
+        return HttpResponseRedirect(f"{url}?v={version}")
+    
+    # Renditions derive from the source content, so the source version keeps them immutable
+    return image_response(request, rendition, public=public, version=version)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def vendor_category_image_variant(request, image_id, variant):
+    """Serve a resized vendor category image"""
+    try:
+        image = VendorCategoryImages.objects.select_related('vendor').defer('image_data').get(
+            Q(vendor__is_verified=True) | Q(vendor__user_id=request.user.id),
+            id=image_id
+        )
+        return variant_response(request, image, variant, 'vendor_category_image',
+                                public=image.vendor.is_verified)
+    
+    except VendorCategoryImages.DoesNotExist:
+        return JsonResponse({'error': 'Image not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def homepage_image_variant(request, image_id, variant):
+    """Serve a resized homepage image"""
+    try:
+        image = AdminHomepageImages.objects.defer('image_data').get(id=image_id, is_active=True)
+        return variant_response(request, image, variant, 'homepage_image')
+    
+    except AdminHomepageImages.DoesNotExist:
+        return JsonResponse({'error': 'Image not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
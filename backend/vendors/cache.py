@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from event_sathi.versions import bump_version, get_version
+
+HITS_KEY = 'vendor_detail:hits'
+MISSES_KEY = 'vendor_detail:misses'
+
+def _version_key(vendor_id):
+    return f'vendor_detail:version:{vendor_id}'
+
+def detail_version(vendor_id):
+    """Current content version of a vendor's detail payload"""
+    return get_version(_version_key(vendor_id))
+
+def bump_detail_version(vendor_id):
+    """Invalidate every cached detail payload of the vendor"""
+    bump_version(_version_key(vendor_id))
+
+def bump_detail_version_on_commit(vendor_id):
+    """Bump the version once the current transaction commits.
+    
+    Bumping earlier would let a concurrent request cache the old rows under
+    the new version until VENDOR_DETAIL_CACHE_TIMEOUT.
+    """
+    transaction.on_commit(lambda: bump_detail_version(vendor_id))
+
+def detail_cache_key(vendor_id, variant):
+    return f'vendor_detail:{vendor_id}:{detail_version(vendor_id)}:{variant}'
+
+def get_cached_detail(key):
+    payload = cache.get(key)
+    _count(HITS_KEY if payload is not None else MISSES_KEY)
+    return payload
+
+def set_cached_detail(key, payload):
+    cache.set(key, payload, settings.VENDOR_DETAIL_CACHE_TIMEOUT)
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+def detail_cache_stats():
+    """Hit/miss counters of the vendor_detail cache"""
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None
+    }
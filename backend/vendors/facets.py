@@ -0,0 +1,59 @@
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import VendorFacetCount
+
+def normalize_city(city):
+    return ' '.join(str(city or '').split()).title()
+
+def facet_keys(categories, city, is_verified):
+    """Every facet row a vendor is counted in"""
+    city = normalize_city(city)
+    names = {name for name in (categories or []) if name}
+    keys = {('', '', is_verified), ('', city, is_verified)}
+    for name in names:
+        keys.add((name, '', is_verified))
+        keys.add((name, city, is_verified))
+    return keys
+
+def vendor_facet_keys(vendor):
+    return facet_keys(vendor.categories, vendor.city, vendor.is_verified)
+
+def apply_facet_deltas(removed, added):
+    """Move a vendor's counts from the `removed` facet keys to the `added` ones"""
+    deltas = Counter()
+    for key in removed - added:
+        deltas[key] -= 1
+    for key in added - removed:
+        deltas[key] += 1
+    
+    for (category_name, city, is_verified), delta in deltas.items():
+        rows = VendorFacetCount.objects.filter(
+            category_name=category_name, city=city, is_verified=is_verified
+        )
+        # F() keeps concurrent changes to the same row from overwriting each other
+        if rows.update(vendor_count=F('vendor_count') + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                VendorFacetCount.objects.create(
+                    category_name=category_name, city=city,
+                    is_verified=is_verified, vendor_count=delta
+                )
+        except IntegrityError:
+            rows.update(vendor_count=F('vendor_count') + delta)
+
+def rebuild_facets(vendors, batch_size=1000):
+    """Recount every facet from scratch; returns the number of facet rows"""
+    counts = Counter()
+    for vendor in vendors.only('categories', 'city', 'is_verified').iterator(chunk_size=batch_size):
+        counts.update(vendor_facet_keys(vendor))
+    
+    with transaction.atomic():
+        VendorFacetCount.objects.all().delete()
+        VendorFacetCount.objects.bulk_create([
+            VendorFacetCount(category_name=category_name, city=city,
+                             is_verified=is_verified, vendor_count=count)
+            for (category_name, city, is_verified), count in counts.items()
+        ], batch_size=batch_size)
+    return len(counts)
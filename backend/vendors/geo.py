@@ -0,0 +1,54 @@
+import math
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+from .models import Pincode
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LATITUDE = 111.045
+
+def normalize_pincode(pincode):
+    return ''.join(str(pincode or '').split())
+
+def geocode_pincode(pincode):
+    """Get (latitude, longitude) of a pincode centroid, or (None, None)"""
+    location = Pincode.objects.filter(pincode=normalize_pincode(pincode)).values_list(
+        'latitude', 'longitude'
+    ).first()
+    return location or (None, None)
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a circle around a point"""
+    lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+    # Clamp so the box stays finite near the poles
+    cos_latitude = max(math.cos(math.radians(latitude)), 0.01)
+    lon_delta = radius_km / (KM_PER_DEGREE_LATITUDE * cos_latitude)
+    return (latitude - lat_delta, latitude + lat_delta,
+            longitude - lon_delta, longitude + lon_delta)
+
+def distance_km(latitude, longitude):
+    """Haversine distance from a point to the vendor's coordinates, in SQL"""
+    origin_lat = Value(math.radians(latitude), output_field=FloatField())
+    origin_lon = Value(math.radians(longitude), output_field=FloatField())
+    half_chord = (
+        Power(Sin((Radians(F('latitude')) - origin_lat) / 2), 2) +
+        Value(math.cos(math.radians(latitude)), output_field=FloatField()) *
+        Cos(Radians(F('latitude'))) *
+        Power(Sin((Radians(F('longitude')) - origin_lon) / 2), 2)
+    )
+    # Clamp rounding error so ASIN never sees a value above 1
+    chord = Least(Sqrt(half_chord), Value(1.0, output_field=FloatField()))
+    return Value(2 * EARTH_RADIUS_KM, output_field=FloatField()) * ASin(chord)
+
+def filter_vendors_near(vendors, latitude, longitude, radius_km):
+    """Vendors within radius_km, annotated with `distance` in kilometres.
+    
+    The bounding box is answered from vendor_geo_idx; the exact haversine
+    distance is only computed for the rows inside it.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    return vendors.filter(
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lon, max_lon)
+    ).annotate(
+        distance=distance_km(latitude, longitude)
+    ).filter(distance__lte=radius_km)
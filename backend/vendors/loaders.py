@@ -0,0 +1,26 @@
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from media_storage.utils import without_image_data
+from .models import VendorCategoryImages
+
+# Number of preview images shown on a vendor card
+LIST_IMAGES_PER_VENDOR = 3
+
+def load_list_images(vendor_ids, per_vendor=LIST_IMAGES_PER_VENDOR, with_data=False):
+    """Get the first images of every vendor in a single query"""
+    images = VendorCategoryImages.objects.filter(vendor_id__in=vendor_ids)
+    if not with_data:
+        images = without_image_data(images)
+    
+    images = images.annotate(
+        position=Window(
+            expression=RowNumber(),
+            partition_by=[F('vendor_id')],
+            order_by=[F('image_order').asc(), F('created_at').asc(), F('id').asc()],
+        )
+    ).filter(position__lte=per_vendor).order_by('vendor_id', 'position')
+
+    images_by_vendor = {}
+    for image in images:
+        images_by_vendor.setdefault(image.vendor_id, []).append(image)
+    return images_by_vendor
@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from accounts.models import VendorProfile
+
+class Command(BaseCommand):
+    help = 'Compare the JSON containment filter with the indexed VendorCategory filter'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('category')
+        parser.add_argument('--runs', type=int, default=20)
+    
+    def handle(self, *args, **options):
+        category = options['category']
+        base = VendorProfile.objects.filter(is_verified=True).only('id')
+        filters = [('VendorCategory index', base.filter(category_links__category_name=category))]
+        
+        if connection.vendor == 'postgresql':
+            filters.insert(0, ('JSON categories__contains', base.filter(categories__contains=[category])))
+        else:
+            self.stdout.write('JSON containment needs PostgreSQL, benchmarking the indexed path only')
+        
+        for label, queryset in filters:
+            timings = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                count = len(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"{count} vendors, median {timings[len(timings) // 2]:.2f} ms, best {timings[0]:.2f} ms")
+            if connection.vendor == 'postgresql':
+                self.stdout.write(queryset.explain(analyze=True))
+            else:
+                self.stdout.write(queryset.explain())
+            self.stdout.write('')
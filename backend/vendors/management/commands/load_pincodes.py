@@ -0,0 +1,91 @@
+import csv
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Replace
+from accounts.models import VendorProfile
+from vendors.models import Pincode
+
+# Header names used by the bundled CSV and by the India Post pincode directory
+COLUMN_ALIASES = {
+    'pincode': ('pincode',),
+    'district': ('district', 'districtname'),
+    'state': ('state', 'statename'),
+    'latitude': ('latitude',),
+    'longitude': ('longitude',),
+}
+
+def _column(row, name):
+    for alias in COLUMN_ALIASES[name]:
+        value = row.get(alias)
+        if value is not None:
+            return value.strip()
+    return ''
+
+def read_pincodes(handle):
+    """Pincode rows from a CSV, one per pincode.
+    
+    The India Post directory lists every post office, several per pincode and
+    some without coordinates; offices of a pincode are averaged into its centroid.
+    """
+    offices = {}
+    reader = csv.DictReader(handle)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    for row in reader:
+        pincode = ''.join(_column(row, 'pincode').split())
+        try:
+            latitude = float(_column(row, 'latitude'))
+            longitude = float(_column(row, 'longitude'))
+        except ValueError:
+            continue
+        if len(pincode) != 6 or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            continue
+        entry = offices.setdefault(pincode, [_column(row, 'district'), _column(row, 'state'), []])
+        entry[2].append((latitude, longitude))
+    
+    return [Pincode(
+        pincode=pincode,
+        district=district,
+        state=state,
+        latitude=sum(point[0] for point in points) / len(points),
+        longitude=sum(point[1] for point in points) / len(points)
+    ) for pincode, (district, state, points) in offices.items()]
+
+class Command(BaseCommand):
+    help = 'Load the offline pincode table and geocode vendors against it'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?',
+                            help='CSV with pincode, district, state, latitude and longitude columns '
+                                 '(default: the PINCODE_DATASET setting)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--skip-geocode', action='store_true',
+                            help='Only load the table, leave vendor coordinates untouched')
+    
+    def handle(self, *args, **options):
+        path = options['path'] or settings.PINCODE_DATASET
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            rows = read_pincodes(handle)
+        
+        Pincode.objects.bulk_create(
+            rows,
+            batch_size=options['batch_size'],
+            update_conflicts=True,
+            unique_fields=['pincode'],
+            update_fields=['district', 'state', 'latitude', 'longitude']
+        )
+        self.stdout.write(f"Loaded {len(rows)} pincodes")
+        
+        if options['skip_geocode']:
+            return
+        
+        # One UPDATE for every vendor; unknown pincodes clear the coordinates
+        centroid = Pincode.objects.filter(
+            pincode=Replace(OuterRef('pincode'), Value(' '), Value(''))
+        )
+        updated = VendorProfile.objects.update(
+            latitude=Subquery(centroid.values('latitude')[:1]),
+            longitude=Subquery(centroid.values('longitude')[:1])
+        )
+        located = VendorProfile.objects.filter(latitude__isnull=False).count()
+        self.stdout.write(self.style.SUCCESS(f"Geocoded {located} of {updated} vendors"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from accounts.models import VendorProfile
+from vendors.facets import rebuild_facets
+
+class Command(BaseCommand):
+    help = 'Recount VendorFacetCount rows from VendorProfile'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        rows = rebuild_facets(VendorProfile.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} facet rows"))
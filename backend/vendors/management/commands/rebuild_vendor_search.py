@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from accounts.models import VendorProfile
+
+SEARCH_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS vendor_search_trgm ON {table} USING gin (search_text gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS vendor_search_tsv ON {table} USING gin (to_tsvector('simple', search_text))",
+]
+
+class Command(BaseCommand):
+    help = 'Backfill VendorProfile.search_text and create the Postgres search indexes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--skip-indexes', action='store_true',
+                            help='Only backfill search_text')
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        vendors = VendorProfile.objects.only(
+            'id', 'business_name', 'city', 'address', 'categories', 'search_text'
+        ).order_by('id')
+        
+        changed = []
+        updated = 0
+        for vendor in vendors.iterator(chunk_size=batch_size):
+            search_text = vendor.build_search_text()
+            if vendor.search_text != search_text:
+                vendor.search_text = search_text
+                changed.append(vendor)
+            if len(changed) >= batch_size:
+                VendorProfile.objects.bulk_update(changed, ['search_text'])
+                updated += len(changed)
+                changed = []
+        if changed:
+            VendorProfile.objects.bulk_update(changed, ['search_text'])
+            updated += len(changed)
+        
+        self.stdout.write(f"Updated search text for {updated} vendors")
+        
+        if options['skip_indexes']:
+            return
+        if connection.vendor != 'postgresql':
+            self.stdout.write('Not on PostgreSQL, search falls back to LIKE without indexes')
+            return
+        
+        table = connection.ops.quote_name(VendorProfile._meta.db_table)
+        with connection.cursor() as cursor:
+            for statement in SEARCH_INDEXES:
+                cursor.execute(statement.format(table=table))
+        self.stdout.write(self.style.SUCCESS('Vendor search indexes are in place'))
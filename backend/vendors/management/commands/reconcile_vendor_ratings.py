@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db.models import (
+    Avg, Case, Count, DecimalField, F, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Abs, Cast, Coalesce
+from accounts.models import VendorProfile
+from vendors.models import VendorReview
+from vendors.cache import bump_detail_version
+
+class Command(BaseCommand):
+    help = 'Recompute VendorProfile rating counters from VendorReview rows'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every vendor, not only the drifted ones')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many vendors have drifted')
+    
+    def handle(self, *args, **options):
+        reviews = VendorReview.objects.filter(vendor=OuterRef('pk')).order_by().values('vendor')
+        actual_count = Coalesce(
+            Subquery(reviews.annotate(value=Count('id')).values('value')),
+            Value(0), output_field=IntegerField()
+        )
+        actual_sum = Coalesce(
+            Subquery(reviews.annotate(value=Sum('rating')).values('value')),
+            Value(0), output_field=IntegerField()
+        )
+        actual_rating = Coalesce(
+            Subquery(reviews.annotate(value=Avg('rating')).values('value')),
+            Value(0), output_field=DecimalField(max_digits=3, decimal_places=2)
+        )
+        
+        vendors = VendorProfile.objects.all()
+        if not options['all']:
+            expected_rating = Case(
+                When(actual_count=0, then=Value(0.0)),
+                default=Cast(F('actual_sum'), FloatField()) / F('actual_count'),
+                output_field=FloatField()
+            )
+            vendors = vendors.annotate(
+                actual_count=actual_count,
+                actual_sum=actual_sum
+            ).annotate(
+                rating_drift=Abs(Cast('rating', FloatField()) - expected_rating)
+            ).filter(
+                ~Q(total_reviews=F('actual_count')) | ~Q(rating_sum=F('actual_sum')) |
+                # rating is stored with two decimals
+                Q(rating_drift__gt=0.005)
+            )
+        
+        vendor_ids = list(vendors.values_list('id', flat=True))
+        if options['dry_run']:
+            self.stdout.write(f"{len(vendor_ids)} vendors need reconciling")
+            return
+        
+        # A single UPDATE with correlated aggregates, no per-vendor round trips
+        updated = VendorProfile.objects.filter(id__in=vendor_ids).update(
+            total_reviews=actual_count,
+            rating_sum=actual_sum,
+            rating=actual_rating
+        )
+        for vendor_id in vendor_ids:
+            bump_detail_version(vendor_id)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled ratings for {updated} vendors"))
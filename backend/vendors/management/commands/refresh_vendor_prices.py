@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from accounts.models import VendorProfile
+from vendors.pricing import price_range_updates
+
+class Command(BaseCommand):
+    help = 'Backfill VendorProfile.min_price/max_price from services and packages'
+    
+    def handle(self, *args, **options):
+        updated = VendorProfile.objects.update(**price_range_updates())
+        priced = VendorProfile.objects.filter(min_price__isnull=False).count()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed prices for {updated} vendors, {priced} have a price range"))
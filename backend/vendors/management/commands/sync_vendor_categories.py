@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from accounts.models import VendorProfile
+from vendors.sync import sync_all_vendor_categories
+
+class Command(BaseCommand):
+    help = 'Backfill VendorCategory rows from VendorProfile.categories'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+    
+    def handle(self, *args, **options):
+        vendors = VendorProfile.objects.only('id', 'categories').order_by('id')
+        created, deleted = sync_all_vendor_categories(vendors, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} and removed {deleted} vendor category links"
+        ))
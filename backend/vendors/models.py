@@ -4,13 +4,18 @@ from accounts.models import VendorProfile
 from categories.models import Category, Subcategory
 
 class VendorCategory(models.Model):
-    vendor = models.ForeignKey(VendorProfile, on_delete=models.CASCADE, related_name='categories')
-    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    """Indexed copy of VendorProfile.categories, kept in sync by vendors.signals"""
+    vendor = models.ForeignKey(VendorProfile, on_delete=models.CASCADE, related_name='category_links')
+    category_name = models.CharField(max_length=100)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
     subcategory = models.ForeignKey(Subcategory, on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        unique_together = ['vendor', 'category']
+        unique_together = ['vendor', 'category_name']
+        indexes = [
+            models.Index(fields=['category_name', 'vendor'], name='vendor_category_name_idx'),
+        ]
 
 class VendorService(models.Model):
     vendor = models.ForeignKey(VendorProfile, on_delete=models.CASCADE, related_name='services')
@@ -46,7 +51,9 @@ class VendorImage(models.Model):
 class VendorCategoryImages(models.Model):
     vendor = models.ForeignKey(VendorProfile, on_delete=models.CASCADE, related_name='category_images')
     category_name = models.CharField(max_length=100)
-    image_data = models.BinaryField()
+    image_data = models.BinaryField(null=True, blank=True)  # Legacy in-table storage
+    blob_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the stored blob
+    image_size = models.PositiveIntegerField(default=0)
     image_name = models.CharField(max_length=255)
     image_type = models.CharField(max_length=50)
     image_order = models.IntegerField(default=0)
@@ -67,3 +74,33 @@ class VendorReview(models.Model):
     
     class Meta:
         unique_together = ['vendor', 'customer']
+
+class Pincode(models.Model):
+    """Offline pincode centroid table used to geocode vendors (see load_pincodes)"""
+    pincode = models.CharField(max_length=6, primary_key=True)
+    district = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    
+    def __str__(self):
+        return f"{self.pincode} ({self.district})"
+
+class VendorFacetCount(models.Model):
+    """Vendor counts per (category, city, verified), kept current by vendors.signals.
+    
+    An empty category_name holds the city's total, an empty city the category's
+    total, and the row with both empty the overall total.
+    """
+    category_name = models.CharField(max_length=100, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    is_verified = models.BooleanField()
+    vendor_count = models.IntegerField(default=0)
+    
+    class Meta:
+        # Leads with category_name, so it also serves ?category= lookups
+        unique_together = ['is_verified', 'category_name', 'city']
+        indexes = [
+            # ?city= lookups, which the unique index cannot seek on
+            models.Index(fields=['is_verified', 'city'], name='facet_city_idx'),
+        ]
@@ -0,0 +1,127 @@
+import base64
+import json
+from django.core.exceptions import FieldError, ValidationError
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor for a list of ordering values"""
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+class KeysetPaginator:
+    """Cursor pagination over a unique ordering such as ['-rating', '-id'].
+    
+    Each page seeks past the last row of the previous one instead of using
+    OFFSET, so with a matching index every page costs the same. Orderings in
+    a single direction over model columns use a row-value comparison; mixed
+    orderings or annotations fall back to an OR of prefix comparisons.
+    """
+    
+    def __init__(self, ordering, page_size):
+        self.ordering = ordering
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.page_size = page_size
+    
+    def _comparison(self, position):
+        return 'lt' if self.ordering[position].startswith('-') else 'gt'
+    
+    def _output_field(self, queryset, name):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is None:
+            return queryset.model._meta.get_field(name)
+        try:
+            return annotation.output_field
+        except FieldError:
+            return None
+    
+    def _clean_values(self, queryset, values):
+        """Convert cursor values to their field types, raising InvalidCursor on a mismatch"""
+        if len(values) != len(self.fields):
+            raise InvalidCursor('Invalid cursor')
+        cleaned = []
+        for field_name, value in zip(self.fields, values):
+            if value is None or isinstance(value, (list, dict)):
+                raise InvalidCursor('Invalid cursor')
+            field = self._output_field(queryset, field_name)
+            if field is not None:
+                try:
+                    value = field.to_python(value)
+                except (ValidationError, ValueError, TypeError):
+                    raise InvalidCursor('Invalid cursor')
+            cleaned.append(value)
+        return cleaned
+    
+    def _after(self, values):
+        """Rows strictly after `values` in the ordering"""
+        condition = Q()
+        for position, field in enumerate(self.fields):
+            clause = Q(**{f"{field}__{self._comparison(position)}": values[position]})
+            for prefix, prefix_field in enumerate(self.fields[:position]):
+                clause &= Q(**{prefix_field: values[prefix]})
+            condition |= clause
+        
+        # Redundant bound on the leading column lets the index seek to the cursor
+        leading = f"{self.fields[0]}__{self._comparison(0)}e"
+        return Q(**{leading: values[0]}) & condition
+    
+    def _row_after(self, model, values):
+        """(a, b) < (x, y) row comparison, usable as a single index condition"""
+        opts = model._meta
+        table = connection.ops.quote_name(opts.db_table)
+        columns = []
+        params = []
+        for field_name, value in zip(self.fields, values):
+            field = opts.get_field(field_name)
+            columns.append(f"{table}.{connection.ops.quote_name(field.column)}")
+            params.append(field.get_db_prep_value(value, connection))
+        
+        operator = '<' if self.ordering[0].startswith('-') else '>'
+        placeholders = ', '.join(['%s'] * len(params))
+        return RawSQL(f"({', '.join(columns)}) {operator} ({placeholders})", params,
+                      output_field=BooleanField())
+    
+    def _supports_row_comparison(self, model):
+        directions = {field.startswith('-') for field in self.ordering}
+        concrete = {field.name for field in model._meta.concrete_fields}
+        return len(directions) == 1 and all(field in concrete for field in self.fields)
+    
+    def page_after(self, queryset, values=None):
+        """Return (rows, has_more) for the page following the ordering values, or the first page"""
+        queryset = queryset.order_by(*self.ordering)
+        if values is not None:
+            values = self._clean_values(queryset, values)
+            if self._supports_row_comparison(queryset.model):
+                queryset = queryset.filter(self._row_after(queryset.model, values))
+            else:
+                queryset = queryset.filter(self._after(values))
+        
+        rows = list(queryset[:self.page_size + 1])
+        return rows[:self.page_size], len(rows) > self.page_size
+    
+    def paginate(self, queryset, cursor=None):
+        """Return (rows, next_cursor); next_cursor is None on the last page"""
+        values = None
+        if cursor:
+            values = decode_cursor(cursor)
+        
+        rows, has_more = self.page_after(queryset, values)
+        if not has_more:
+            return rows, None
+        
+        last = rows[-1]
+        return rows, encode_cursor([getattr(last, field) for field in self.fields])
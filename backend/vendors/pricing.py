@@ -0,0 +1,32 @@
+from django.db.models import DecimalField, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, Least
+from accounts.models import VendorProfile
+from .models import VendorService, VendorPackage
+
+def _aggregate(queryset, expression):
+    """Correlated subquery computing one aggregate over a vendor's rows"""
+    return Subquery(
+        queryset.filter(vendor=OuterRef('pk')).order_by().values('vendor').annotate(
+            value=expression
+        ).values('value'),
+        output_field=DecimalField(max_digits=10, decimal_places=2)
+    )
+
+def price_range_updates():
+    """UPDATE expressions recomputing min_price/max_price from services and active packages"""
+    services = VendorService.objects.all()
+    packages = VendorPackage.objects.filter(is_active=True)
+    service_min = _aggregate(services, Min('base_price'))
+    service_max = _aggregate(services, Max(Coalesce('max_price', 'base_price')))
+    package_min = _aggregate(packages, Min('price'))
+    package_max = _aggregate(packages, Max('price'))
+    
+    # SQLite's MIN/MAX return NULL if any argument is NULL, so fill the gaps first
+    return {
+        'min_price': Least(Coalesce(service_min, package_min), Coalesce(package_min, service_min)),
+        'max_price': Greatest(Coalesce(service_max, package_max), Coalesce(package_max, service_max)),
+    }
+
+def refresh_price_range(vendor_id):
+    """Recompute one vendor's price range in a single UPDATE"""
+    VendorProfile.objects.filter(pk=vendor_id).update(**price_range_updates())
@@ -0,0 +1,21 @@
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from accounts.models import VendorProfile
+
+def apply_review_delta(vendor_id, count_delta, sum_delta):
+    """Adjust a vendor's review counters in one atomic UPDATE.
+    
+    Every F() reads the row's current values inside the UPDATE itself, so
+    concurrent review changes never overwrite each other.
+    """
+    new_count = F('total_reviews') + count_delta
+    new_sum = F('rating_sum') + sum_delta
+    VendorProfile.objects.filter(pk=vendor_id).update(
+        total_reviews=new_count,
+        rating_sum=new_sum,
+        rating=Case(
+            When(total_reviews__lte=-count_delta, then=Value(0.0)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField()
+        )
+    )
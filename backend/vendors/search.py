@@ -0,0 +1,68 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from accounts.models import VendorProfile, normalize_search_text
+
+# Typeahead answers are capped to keep index scans short
+MAX_SEARCH_RESULTS = 20
+
+def uses_postgres_search():
+    return connection.vendor == 'postgresql'
+
+def _full_text_match(term):
+    # Must match the expression of the vendor_search_tsv index exactly
+    return RawSQL(
+        "to_tsvector('simple', search_text) @@ plainto_tsquery('simple', %s)",
+        (term,),
+        output_field=BooleanField()
+    )
+
+def _full_text_rank(term):
+    return RawSQL(
+        "ts_rank(to_tsvector('simple', search_text), plainto_tsquery('simple', %s))",
+        (term,),
+        output_field=FloatField()
+    )
+
+def filter_vendors_by_search(vendors, query):
+    """Restrict a VendorProfile queryset to vendors matching the search query"""
+    term = normalize_search_text(query)
+    if not term:
+        return vendors
+    
+    if uses_postgres_search():
+        # Substring, fuzzy word and full-text matches are all served by GIN indexes
+        return vendors.filter(
+            Q(search_text__contains=term) |
+            Q(search_text__trigram_word_similar=term) |
+            Q(_full_text_match(term))
+        )
+    
+    # SQLite fallback for local development: every word must appear
+    for word in term.split():
+        vendors = vendors.filter(search_text__contains=word)
+    return vendors
+
+def search_vendors(query, limit=MAX_SEARCH_RESULTS):
+    """Get verified vendors matching the query, best matches first"""
+    term = normalize_search_text(query)
+    if not term:
+        return []
+    
+    vendors = filter_vendors_by_search(VendorProfile.objects.filter(is_verified=True), term)
+    fields = ('id', 'business_name', 'city', 'categories', 'rating', 'search_text')
+    
+    if uses_postgres_search():
+        vendors = vendors.annotate(
+            score=TrigramWordSimilarity(term, 'search_text') + _full_text_rank(term)
+        ).order_by('-score', '-rating', 'id').only(*fields)
+        return list(vendors[:limit])
+    
+    # Rank in Python on SQLite: business name prefix, then name match, then anything else
+    results = list(vendors.order_by('-rating', 'id').only(*fields)[:limit * 5])
+    for vendor in results:
+        name = normalize_search_text(vendor.business_name)
+        vendor.score = 2.0 if name.startswith(term) else 1.0 if term in name else 0.5
+    results.sort(key=lambda vendor: -vendor.score)
+    return results[:limit]
@@ -0,0 +1,135 @@
+from django.db.models.signals import post_save, pre_save, post_delete
+from django.dispatch import receiver
+from accounts.models import User, VendorProfile
+from .models import VendorReview, VendorService, VendorPackage, VendorCategoryImages
+from .cache import bump_detail_version_on_commit
+from .facets import apply_facet_deltas, facet_keys, vendor_facet_keys
+from .geo import geocode_pincode
+from .pricing import refresh_price_range
+from .ratings import apply_review_delta
+from .sync import sync_vendor_categories
+
+@receiver(post_save, sender=VendorProfile)
+def vendor_profile_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep VendorCategory rows in step with VendorProfile.categories"""
+    if raw:
+        return
+    if update_fields is not None and 'categories' not in update_fields:
+        return
+    sync_vendor_categories(instance)
+
+@receiver(pre_save, sender=VendorProfile)
+def vendor_profile_geocoding(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Place the vendor at its pincode centroid"""
+    if raw:
+        return
+    if update_fields is not None and 'pincode' not in update_fields:
+        return
+    instance.latitude, instance.longitude = geocode_pincode(instance.pincode)
+
+# VendorProfile fields that decide which facet rows a vendor is counted in
+FACET_FIELDS = {'categories', 'city', 'is_verified'}
+
+@receiver(pre_save, sender=VendorProfile)
+def vendor_profile_facets_changing(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored facet keys so post_save can move only the difference"""
+    instance._previous_facets = None
+    if raw:
+        return
+    if update_fields is not None and not FACET_FIELDS & set(update_fields):
+        return
+    instance._previous_facets = set()
+    if instance.pk is not None:
+        previous = VendorProfile.objects.filter(pk=instance.pk).values_list(
+            'categories', 'city', 'is_verified'
+        ).first()
+        if previous is not None:
+            instance._previous_facets = facet_keys(*previous)
+
+@receiver(post_save, sender=VendorProfile)
+def vendor_profile_facets_saved(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_facets', None)
+    if raw or previous is None:
+        return
+    apply_facet_deltas(previous, vendor_facet_keys(instance))
+
+@receiver(post_delete, sender=VendorProfile)
+def vendor_profile_facets_deleted(sender, instance, **kwargs):
+    apply_facet_deltas(vendor_facet_keys(instance), set())
+
+@receiver(pre_save, sender=VendorReview)
+def vendor_review_changing(sender, instance, raw=False, **kwargs):
+    """Remember the stored review so post_save can apply only the difference"""
+    instance._previous_review = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_review = (
+        VendorReview.objects.filter(pk=instance.pk).values_list('vendor_id', 'rating').first()
+    )
+
+@receiver(post_save, sender=VendorReview)
+def vendor_review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_review', None)
+    rating = int(instance.rating)
+    
+    if previous is None:
+        apply_review_delta(instance.vendor_id, 1, rating)
+        bump_detail_version_on_commit(instance.vendor_id)
+        return
+    
+    previous_vendor_id, previous_rating = previous
+    if previous_vendor_id == instance.vendor_id:
+        if previous_rating != rating:
+            apply_review_delta(instance.vendor_id, 0, rating - previous_rating)
+            bump_detail_version_on_commit(instance.vendor_id)
+    else:
+        apply_review_delta(previous_vendor_id, -1, -previous_rating)
+        apply_review_delta(instance.vendor_id, 1, rating)
+        bump_detail_version_on_commit(previous_vendor_id)
+        bump_detail_version_on_commit(instance.vendor_id)
+
+@receiver(post_delete, sender=VendorReview)
+def vendor_review_deleted(sender, instance, **kwargs):
+    apply_review_delta(instance.vendor_id, -1, -int(instance.rating))
+    bump_detail_version_on_commit(instance.vendor_id)
+
+@receiver(post_save, sender=VendorProfile)
+@receiver(post_delete, sender=VendorProfile)
+def vendor_profile_changed(sender, instance, **kwargs):
+    bump_detail_version_on_commit(instance.id)
+
+@receiver(post_save, sender=VendorService)
+@receiver(post_delete, sender=VendorService)
+@receiver(post_save, sender=VendorPackage)
+@receiver(post_delete, sender=VendorPackage)
+@receiver(post_save, sender=VendorCategoryImages)
+@receiver(post_delete, sender=VendorCategoryImages)
+def vendor_content_changed(sender, instance, **kwargs):
+    """Invalidate the cached vendor_detail payload when its content changes"""
+    bump_detail_version_on_commit(instance.vendor_id)
+
+@receiver(post_save, sender=VendorService)
+@receiver(post_delete, sender=VendorService)
+@receiver(post_save, sender=VendorPackage)
+@receiver(post_delete, sender=VendorPackage)
+def vendor_pricing_changed(sender, instance, raw=False, **kwargs):
+    """Keep VendorProfile.min_price/max_price in step with services and packages"""
+    if raw:
+        return
+    refresh_price_range(instance.vendor_id)
+
+# User fields vendor_detail shows: the owner's name, email, phone and join date
+DETAIL_USER_FIELDS = {'first_name', 'last_name', 'email', 'phone', 'date_joined'}
+
+@receiver(post_save, sender=User)
+def vendor_user_changed(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or instance.user_type != 'vendor':
+        return
+    # Logins save last_login alone and must not evict the detail payload
+    if update_fields is not None and not DETAIL_USER_FIELDS & set(update_fields):
+        return
+    vendor_id = VendorProfile.objects.filter(user=instance).values_list('id', flat=True).first()
+    if vendor_id is not None:
+        bump_detail_version_on_commit(vendor_id)
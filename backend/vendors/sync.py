@@ -0,0 +1,63 @@
+from categories.models import Category
+from .models import VendorCategory
+
+def _category_names(vendor):
+    return {name for name in (vendor.categories or []) if name}
+
+def sync_vendor_categories(vendor):
+    """Mirror vendor.categories into VendorCategory rows"""
+    wanted = _category_names(vendor)
+    existing = set(
+        VendorCategory.objects.filter(vendor=vendor).values_list('category_name', flat=True)
+    )
+    
+    stale = existing - wanted
+    if stale:
+        VendorCategory.objects.filter(vendor=vendor, category_name__in=stale).delete()
+    
+    missing = wanted - existing
+    if missing:
+        categories = dict(Category.objects.filter(name__in=missing).values_list('name', 'id'))
+        VendorCategory.objects.bulk_create([
+            VendorCategory(vendor=vendor, category_name=name, category_id=categories.get(name))
+            for name in missing
+        ], ignore_conflicts=True)
+
+def sync_all_vendor_categories(vendors, batch_size=500):
+    """Backfill VendorCategory rows for many vendors; returns (created, deleted)"""
+    categories = dict(Category.objects.values_list('name', 'id'))
+    created = deleted = 0
+    batch = []
+    
+    def flush(batch):
+        vendor_ids = [vendor.id for vendor in batch]
+        existing = {}
+        for link_id, vendor_id, name in VendorCategory.objects.filter(
+                vendor_id__in=vendor_ids).values_list('id', 'vendor_id', 'category_name'):
+            existing[(vendor_id, name)] = link_id
+        
+        wanted = {(vendor.id, name) for vendor in batch for name in _category_names(vendor)}
+        stale_ids = [link_id for key, link_id in existing.items() if key not in wanted]
+        new_links = [
+            VendorCategory(vendor_id=vendor_id, category_name=name, category_id=categories.get(name))
+            for vendor_id, name in wanted if (vendor_id, name) not in existing
+        ]
+        
+        if stale_ids:
+            VendorCategory.objects.filter(id__in=stale_ids).delete()
+        VendorCategory.objects.bulk_create(new_links, ignore_conflicts=True)
+        return len(new_links), len(stale_ids)
+    
+    for vendor in vendors.iterator(chunk_size=batch_size):
+        batch.append(vendor)
+        if len(batch) >= batch_size:
+            batch_created, batch_deleted = flush(batch)
+            created += batch_created
+            deleted += batch_deleted
+            batch = []
+    if batch:
+        batch_created, batch_deleted = flush(batch)
+        created += batch_created
+        deleted += batch_deleted
+    
+    return created, deleted
@@ -0,0 +1,324 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.core.exceptions import FieldError
+from django.core.management import call_command
+from django.db.models import F
+from django.test import RequestFactory, TestCase
+from accounts.models import CustomerProfile, User, VendorProfile
+from event_sathi.streaming import iter_queryset, streaming_json_response
+from .cache import detail_version
+from .models import Pincode, VendorCategoryImages, VendorPackage, VendorReview, VendorService
+from .pagination import InvalidCursor, KeysetPaginator, encode_cursor
+from .views import vendor_detail, vendor_list
+
+def make_vendor(number, **fields):
+    user = User.objects.create(
+        username=f'vendor{number}', email=f'vendor{number}@example.com',
+        first_name='Vendor', last_name=str(number), user_type='vendor'
+    )
+    values = {
+        'user': user,
+        'business_name': f'Vendor {number}',
+        'aadhaar_number': f'aadhaar{number}',
+        'pan_number': f'pan{number}',
+        'address': 'MG Road',
+        'city': 'Pune',
+        'state': 'Maharashtra',
+        'pincode': '411001',
+        'is_verified': True,
+    }
+    values.update(fields)
+    return VendorProfile.objects.create(**values)
+
+class VendorListQueryCountTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.vendor_count = 0
+    
+    def add_vendors(self, count):
+        for _ in range(count):
+            self.vendor_count += 1
+            vendor = make_vendor(self.vendor_count)
+            VendorService.objects.create(vendor=vendor, title='Service', description='', base_price=1000)
+            VendorPackage.objects.create(vendor=vendor, name='Package', description='', price=5000)
+            for order in range(2):
+                VendorCategoryImages.objects.create(
+                    vendor=vendor, category_name='Photography', image_name=f'{order}.jpg',
+                    image_type='image/jpeg', image_order=order, blob_hash=f'{vendor.id:032x}{order:032x}'
+                )
+    
+    def list_vendors(self):
+        with self.assertNumQueries(2):
+            response = vendor_list(self.factory.get('/api/vendors/', {'page_size': 50}))
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['vendors']
+    
+    def test_query_count_does_not_grow_with_vendors(self):
+        self.add_vendors(4)
+        vendors = self.list_vendors()
+        self.assertEqual(len(vendors), 4)
+        
+        self.add_vendors(4)
+        vendors = self.list_vendors()
+        self.assertEqual(len(vendors), 8)
+        self.assertTrue(all(len(vendor['images']) == 2 for vendor in vendors))
+        self.assertTrue(all(vendor['price_range'] == '₹1000 - ₹5000' for vendor in vendors))
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        # Ties on rating make the id tie-breaker matter
+        for number, rating in enumerate([4.5, 4.5, 3.0, 5.0, 4.5, 3.0, 0.0], start=1):
+            make_vendor(number, rating=rating)
+    
+    def walk(self, paginator, queryset):
+        ids = []
+        cursor = None
+        while True:
+            rows, cursor = paginator.paginate(queryset, cursor)
+            ids.extend(row.id for row in rows)
+            if cursor is None:
+                return ids
+    
+    def test_pages_cover_every_row_once_in_order(self):
+        queryset = VendorProfile.objects.all()
+        expected = list(queryset.order_by('-rating', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk(KeysetPaginator(['-rating', '-id'], 2), queryset), expected)
+    
+    def test_mixed_directions_fall_back_to_prefix_comparisons(self):
+        queryset = VendorProfile.objects.all()
+        expected = list(queryset.order_by('-rating', 'id').values_list('id', flat=True))
+        self.assertEqual(self.walk(KeysetPaginator(['-rating', 'id'], 3), queryset), expected)
+    
+    def test_annotated_ordering(self):
+        queryset = VendorProfile.objects.annotate(score=F('rating') * 2)
+        expected = list(queryset.order_by('score', 'id').values_list('id', flat=True))
+        self.assertEqual(self.walk(KeysetPaginator(['score', 'id'], 2), queryset), expected)
+    
+    def test_last_page_has_no_cursor(self):
+        rows, cursor = KeysetPaginator(['-rating', '-id'], 7).paginate(VendorProfile.objects.all())
+        self.assertEqual(len(rows), 7)
+        self.assertIsNone(cursor)
+    
+    def test_malformed_cursors_are_rejected(self):
+        paginator = KeysetPaginator(['-rating', '-id'], 2)
+        for cursor in ['not base64!', encode_cursor({'rating': 1}), encode_cursor([4.5])]:
+            with self.assertRaises(InvalidCursor):
+                paginator.paginate(VendorProfile.objects.all(), cursor)
+    
+    def test_cursor_values_of_the_wrong_type_are_rejected(self):
+        paginator = KeysetPaginator(['-rating', '-id'], 2)
+        for values in [['x', 1], [4.5, 'x'], [None, 1], [[4.5], 1]]:
+            with self.assertRaises(InvalidCursor):
+                paginator.paginate(VendorProfile.objects.all(), encode_cursor(values))
+        queryset = VendorProfile.objects.annotate(score=F('rating') * 2)
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator(['score', 'id'], 2).paginate(queryset, encode_cursor(['x', 1]))
+    
+    def test_parameter_errors_keep_their_own_messages(self):
+        Pincode.objects.create(pincode='411001', latitude=18.52, longitude=73.85)
+        for params, error in [
+            ({'page_size': 'x'}, 'page_size must be a number'),
+            ({'near': '411001', 'radius_km': 'far'}, 'radius_km must be a number'),
+            ({'min_price': 'cheap'}, 'min_price and max_price must be numbers'),
+            ({'available_on': '2027-02-30'}, 'available_on takes YYYY-MM-DD and available_between YYYY-MM-DD,YYYY-MM-DD'),
+        ]:
+            response = vendor_list(RequestFactory().get('/api/vendors/', params))
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(json.loads(response.content)['error'], error)
+    
+    def test_invalid_distance_cursor_is_a_bad_request(self):
+        Pincode.objects.create(pincode='411001', latitude=18.52, longitude=73.85)
+        make_vendor(99, latitude=18.52, longitude=73.85)
+        request = RequestFactory().get('/api/vendors/', {'near': '411001', 'cursor': 'WyJ4IiwxXQ'})
+        response = vendor_list(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {'error': 'Invalid cursor'})
+
+class IterQuerysetTests(TestCase):
+    def setUp(self):
+        for number, rating in enumerate([4.5, 4.5, 3.0, 5.0, 4.5], start=1):
+            make_vendor(number, rating=rating)
+    
+    def test_chunks_keep_the_ordering(self):
+        queryset = VendorProfile.objects.order_by('-rating', '-id')
+        with self.assertNumQueries(3):
+            ids = [vendor.id for vendor in iter_queryset(queryset, chunk_size=2)]
+        self.assertEqual(ids, list(queryset.values_list('id', flat=True)))
+    
+    def test_stream_setup_errors_raise_before_the_response(self):
+        def broken_rows():
+            raise FieldError('Cannot resolve keyword')
+            yield
+        
+        with self.assertRaises(FieldError):
+            streaming_json_response(broken_rows())
+        response = streaming_json_response(iter([]))
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
+    
+    def test_id_is_added_as_tie_breaker(self):
+        queryset = VendorProfile.objects.order_by('rating')
+        ids = [vendor.id for vendor in iter_queryset(queryset, chunk_size=2)]
+        self.assertEqual(ids, list(queryset.order_by('rating', 'id').values_list('id', flat=True)))
+
+class ReviewRatingTests(TestCase):
+    def setUp(self):
+        self.vendor = make_vendor(1)
+        self.other_vendor = make_vendor(2)
+        self.customers = [
+            CustomerProfile.objects.create(
+                user=User.objects.create(username=f'customer{n}', email=f'customer{n}@example.com')
+            )
+            for n in range(3)
+        ]
+    
+    def assertCounters(self, vendor, total_reviews, rating_sum, rating):
+        vendor.refresh_from_db()
+        self.assertEqual(vendor.total_reviews, total_reviews)
+        self.assertEqual(vendor.rating_sum, rating_sum)
+        self.assertAlmostEqual(float(vendor.rating), rating, places=2)
+    
+    def review(self, customer, rating, vendor=None):
+        return VendorReview.objects.create(
+            vendor=vendor or self.vendor, customer=customer, rating=rating, comment=''
+        )
+    
+    def test_create_update_and_delete(self):
+        first = self.review(self.customers[0], 5)
+        self.review(self.customers[1], 4)
+        self.review(self.customers[2], 2)
+        self.assertCounters(self.vendor, 3, 11, 11 / 3)
+        
+        first.rating = 3
+        first.save()
+        self.assertCounters(self.vendor, 3, 9, 3.0)
+        
+        first.delete()
+        self.assertCounters(self.vendor, 2, 6, 3.0)
+    
+    def test_unchanged_rating_is_not_counted_twice(self):
+        review = self.review(self.customers[0], 4)
+        review.comment = 'Edited'
+        review.save()
+        self.assertCounters(self.vendor, 1, 4, 4.0)
+    
+    def test_moving_a_review_between_vendors(self):
+        review = self.review(self.customers[0], 4)
+        self.review(self.customers[1], 2)
+        review.vendor = self.other_vendor
+        review.save()
+        self.assertCounters(self.vendor, 1, 2, 2.0)
+        self.assertCounters(self.other_vendor, 1, 4, 4.0)
+    
+    def test_deleting_the_last_review_resets_the_rating(self):
+        self.review(self.customers[0], 5).delete()
+        self.assertCounters(self.vendor, 0, 0, 0.0)
+    
+    def test_full_save_of_a_stale_profile_keeps_the_counters(self):
+        vendor = VendorProfile.objects.get(pk=self.vendor.pk)
+        self.review(self.customers[0], 5)
+        VendorService.objects.create(vendor=self.vendor, title='Service', description='', base_price=1000)
+        vendor.business_name = 'Renamed'
+        vendor.save()
+        self.assertCounters(self.vendor, 1, 5, 5.0)
+        self.assertEqual(self.vendor.min_price, 1000)
+        self.assertEqual(self.vendor.business_name, 'Renamed')
+    
+    def test_reconcile_matches_incremental_counters(self):
+        self.review(self.customers[0], 5)
+        self.review(self.customers[1], 2)
+        VendorProfile.objects.filter(pk=self.vendor.pk).update(total_reviews=9, rating_sum=1, rating=0.1)
+        call_command('reconcile_vendor_ratings', stdout=StringIO())
+        self.assertCounters(self.vendor, 2, 7, 3.5)
+    
+    def test_reconcile_repairs_a_stale_rating_with_correct_counters(self):
+        self.review(self.customers[0], 5)
+        self.review(self.customers[1], 4)
+        self.review(self.customers[2], 4)
+        VendorProfile.objects.filter(pk=self.vendor.pk).update(rating=1.0)
+        VendorProfile.objects.filter(pk=self.other_vendor.pk).update(rating=0)
+        stdout = StringIO()
+        call_command('reconcile_vendor_ratings', '--dry-run', stdout=stdout)
+        self.assertEqual(stdout.getvalue().strip(), '1 vendors need reconciling')
+        call_command('reconcile_vendor_ratings', stdout=StringIO())
+        self.assertCounters(self.vendor, 3, 13, 13 / 3)
+
+class DetailCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+    
+    def get_detail(self, vendor):
+        response = vendor_detail(RequestFactory().get(f'/api/vendors/{vendor.id}/'), vendor.id)
+        self.assertEqual(response.status_code, 200)
+        return response
+    
+    def test_detail_is_cached_until_the_vendor_changes(self):
+        vendor = make_vendor(1)
+        first = self.get_detail(vendor)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        second = self.get_detail(vendor)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(json.loads(second.content), json.loads(first.content))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            VendorService.objects.create(vendor=vendor, title='Service', description='', base_price=1000)
+        response = self.get_detail(vendor)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(json.loads(response.content)['vendor']['services']), 1)
+    
+    def test_version_is_bumped_only_on_commit(self):
+        vendor = make_vendor(1)
+        version = detail_version(vendor.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            VendorService.objects.create(vendor=vendor, title='Service', description='', base_price=1000)
+            self.assertEqual(detail_version(vendor.id), version)
+        self.assertNotEqual(detail_version(vendor.id), version)
+    
+    def test_login_does_not_invalidate_but_profile_edits_do(self):
+        vendor = make_vendor(1)
+        version = detail_version(vendor.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, vendor.user)
+        self.assertEqual(detail_version(vendor.id), version)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            vendor.user.phone = '9876543210'
+            vendor.user.save(update_fields=['phone'])
+        self.assertNotEqual(detail_version(vendor.id), version)
+
+class ProximityTests(TestCase):
+    def test_unknown_pincode_gives_an_empty_page_with_a_notice(self):
+        response = vendor_list(RequestFactory().get('/api/vendors/', {'near': '999999'}))
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['vendors'], [])
+        self.assertFalse(data['has_more'])
+        self.assertIn('999999', data['notice'])
+    
+    def test_load_pincodes_reads_the_post_office_directory(self):
+        vendor = make_vendor(1, pincode='413512')
+        self.assertIsNone(vendor.latitude)
+        directory = (
+            'circlename,officename,pincode,officetype,delivery,district,statename,latitude,longitude\n'
+            'Maharashtra Circle,Latur H.O,413512,H.O,Delivery,LATUR,MAHARASHTRA,18.40,76.56\n'
+            'Maharashtra Circle,Latur City S.O,413512,S.O,Delivery,LATUR,MAHARASHTRA,18.42,76.58\n'
+            'Maharashtra Circle,Ausa Road B.O,413512,B.O,Delivery,LATUR,MAHARASHTRA,NA,NA\n'
+        )
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(directory)
+        try:
+            with self.settings(PINCODE_DATASET=handle.name):
+                call_command('load_pincodes', stdout=StringIO())
+        finally:
+            os.unlink(handle.name)
+        
+        pincode = Pincode.objects.get(pincode='413512')
+        self.assertEqual((pincode.district, pincode.state), ('LATUR', 'MAHARASHTRA'))
+        self.assertAlmostEqual(pincode.latitude, 18.41)
+        self.assertAlmostEqual(pincode.longitude, 76.57)
+        
+        response = vendor_list(RequestFactory().get('/api/vendors/', {'near': '413512'}))
+        self.assertEqual([item['id'] for item in json.loads(response.content)['vendors']], [vendor.id])
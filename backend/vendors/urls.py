@@ -3,7 +3,10 @@ from . import views
 
 urlpatterns = [
     path('', views.vendor_list, name='vendor_list'),
+    path('search/', views.vendor_search, name='vendor_search'),
+    path('facets/', views.vendor_facets, name='vendor_facets'),
     path('<int:vendor_id>/', views.vendor_detail, name='vendor_detail'),
     path('upload-category-image/', views.upload_vendor_category_image, name='upload_vendor_category_image'),
+    path('upload-category-images/', views.upload_vendor_category_images, name='upload_vendor_category_images'),
     path('dashboard/', views.vendor_dashboard_data, name='vendor_dashboard_data'),
 ]
\ No newline at end of file
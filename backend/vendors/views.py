@@ -1,14 +1,125 @@
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Avg
+from django.db import transaction
+from django.db.models import Q, Avg, Count, F, Max, Window
+from django.utils.dateparse import parse_date
 from accounts.models import VendorProfile
 from categories.models import Category
-from .models import VendorService, VendorPackage, VendorImage, VendorCategoryImages
+from .models import VendorService, VendorPackage, VendorImage, VendorCategoryImages, VendorFacetCount
+from .loaders import load_list_images
+from .search import filter_vendors_by_search, search_vendors, MAX_SEARCH_RESULTS
+from .pagination import KeysetPaginator, InvalidCursor
+from .facets import normalize_city
+from .geo import geocode_pincode, filter_vendors_near
+from .cache import detail_cache_key, get_cached_detail, set_cached_detail, bump_detail_version_on_commit
+from event_sathi.streaming import wants_streaming, iter_queryset, iter_chunks, streaming_json_response
+from media_storage.utils import wants_inline_images, without_image_data, image_data_uri, image_reference, list_image_variant, store_image_upload
+from media_storage.renditions import schedule_renditions
+from media_storage.uploads import receive_image, receive_images, UploadRejected
+from bookings.availability import filter_vendors_available
 import json
-import base64
-import random
+from decimal import Decimal, InvalidOperation
+
+# Keyset orderings for vendor_list ?sort=
+PRICE_ORDERINGS = {
+    'price_asc': ['min_price', 'id'],
+    'price_desc': ['-max_price', '-id'],
+}
+
+def _parse_price(value):
+    price = Decimal(value)
+    if not price.is_finite():
+        raise InvalidOperation(value)
+    return price
+
+def _parse_available_dates(available_on, available_between):
+    """(start_date, end_date) from ?available_on=D or ?available_between=D1,D2"""
+    if available_on and available_between:
+        raise ValueError('Pass either available_on or available_between, not both')
+    values = [available_on] if available_on else available_between.split(',')
+    try:
+        days = [parse_date(value.strip()) for value in values]
+    except ValueError:
+        # Well-formed but impossible dates such as 2027-02-30
+        days = [None]
+    if len(days) not in (1, 2) or None in days:
+        raise ValueError('available_on takes YYYY-MM-DD and available_between YYYY-MM-DD,YYYY-MM-DD')
+    start_date, end_date = days[0], days[-1]
+    if end_date < start_date:
+        raise ValueError('available_between must not end before it starts')
+    if (end_date - start_date).days >= settings.AVAILABILITY_MAX_DAYS:
+        raise ValueError(f"available_between can span at most {settings.AVAILABILITY_MAX_DAYS} days")
+    return start_date, end_date
+
+def _category_image_data(request, image, inline_images, variant=None):
+    """Serialize a vendor category image as a data URI or a media URL"""
+    image_data = {
+        'id': image.id,
+        'image_name': image.image_name,
+        'is_featured': image.is_featured,
+        'order': image.image_order
+    }
+    if inline_images:
+        image_data['image_url'] = image_data_uri(image)
+    else:
+        reference = image_reference(request, image, 'vendor_category_image', variant=variant)
+        image_data.update({
+            'image_url': reference['url'],
+            'image_type': reference['type'],
+            'image_size': reference['size'],
+            'version': reference['version']
+        })
+        if variant:
+            image_data['original_url'] = reference['original_url']
+    return image_data
+
+def _vendor_list_item(request, vendor, images_by_vendor, inline_images):
+    """Serialize a vendor card for vendor_list"""
+    # Get vendor images for display, as thumbnails unless another variant is asked for
+    images = []
+    variant = list_image_variant(request)
+    for img in images_by_vendor.get(vendor.id, []):
+        if inline_images:
+            images.append(image_data_uri(img))
+        else:
+            images.append(image_reference(request, img, 'vendor_category_image', variant=variant))
+    
+    vendor_data = {
+        'id': vendor.id,
+        'business_name': vendor.business_name,
+        'vendor_name': f"{vendor.user.first_name} {vendor.user.last_name}",
+        'email': vendor.user.email,
+        'phone_number': vendor.user.phone,
+        'address': vendor.address,
+        'city': vendor.city,
+        'state': vendor.state,
+        'categories': vendor.categories,
+        'rating': float(vendor.rating),
+        'total_reviews': vendor.total_reviews,
+        'images': images,
+        'price_range': (
+            f"₹{int(vendor.min_price)} - ₹{int(vendor.max_price)}"
+            if vendor.min_price is not None else None
+        ),
+        'min_price': float(vendor.min_price) if vendor.min_price is not None else None,
+        'max_price': float(vendor.max_price) if vendor.max_price is not None else None,
+        'subscription_plan': vendor.subscription_plan,
+        'created_at': vendor.user.date_joined.isoformat()
+    }
+    if getattr(vendor, 'distance', None) is not None:
+        vendor_data['distance_km'] = round(vendor.distance, 2)
+    return vendor_data
+
+def _stream_vendor_list(request, vendors, inline_images):
+    """Serialize vendors chunk by chunk, batch-loading each chunk's images"""
+    for chunk in iter_chunks(iter_queryset(vendors), settings.STREAM_CHUNK_SIZE):
+        vendor_ids = [vendor.id for vendor in chunk]
+        images_by_vendor = load_list_images(vendor_ids, with_data=inline_images)
+        for vendor in chunk:
+            yield _vendor_list_item(request, vendor, images_by_vendor, inline_images)
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -17,53 +128,171 @@ def vendor_list(request):
     try:
         category = request.GET.get('category')
         location = request.GET.get('location')
+        search = request.GET.get('search')
+        inline_images = wants_inline_images(request)
+        try:
+            page_size = min(
+                int(request.GET.get('page_size', settings.VENDOR_LIST_PAGE_SIZE)),
+                settings.VENDOR_LIST_MAX_PAGE_SIZE
+            )
+        except ValueError:
+            return JsonResponse({'error': 'page_size must be a number'}, status=400)
+        if page_size < 1:
+            return JsonResponse({'error': 'page_size must be positive'}, status=400)
         
-        vendors = VendorProfile.objects.filter(is_verified=True)
+        vendors = VendorProfile.objects.filter(is_verified=True).select_related('user')
         
         if category and category != 'All':
-            vendors = vendors.filter(categories__contains=[category])
+            vendors = vendors.filter(category_links__category_name=category)
         
         if location and location != 'All':
             vendors = vendors.filter(Q(city__icontains=location) | Q(address__icontains=location))
         
-        vendor_data = []
-        for vendor in vendors:
-            # Get vendor images for display
-            vendor_images = VendorCategoryImages.objects.filter(vendor=vendor)[:3]
-            images = []
-            for img in vendor_images:
-                image_base64 = base64.b64encode(img.image_data).decode('utf-8')
-                image_url = f"data:{img.image_type};base64,{image_base64}"
-                images.append(image_url)
-            
-            # Calculate price range from services
-            services = VendorService.objects.filter(vendor=vendor)
-            if services:
-                min_price = min([service.base_price for service in services])
-                max_price = max([service.max_price or service.base_price for service in services])
-            else:
-                min_price = random.randint(10000, 30000)
-                max_price = min_price + random.randint(20000, 50000)
-            
-            vendor_data.append({
-                'id': vendor.id,
-                'business_name': vendor.business_name,
-                'vendor_name': f"{vendor.user.first_name} {vendor.user.last_name}",
-                'email': vendor.user.email,
-                'phone_number': vendor.user.phone,
-                'address': vendor.address,
-                'city': vendor.city,
-                'state': vendor.state,
-                'categories': vendor.categories,
-                'rating': float(vendor.rating),
-                'total_reviews': vendor.total_reviews,
-                'images': images,
-                'price_range': f"₹{int(min_price)} - ₹{int(max_price)}",
-                'subscription_plan': vendor.subscription_plan,
-                'created_at': vendor.user.date_joined.isoformat()
-            })
-        
-        return JsonResponse({'vendors': vendor_data})
+        if search:
+            vendors = filter_vendors_by_search(vendors, search)
+        
+        # Proximity search around a pincode, nearest first
+        ordering = ['-rating', '-id']
+        near = request.GET.get('near')
+        if near:
+            latitude, longitude = geocode_pincode(near)
+            if latitude is None:
+                # Nothing can be placed near a pincode missing from the PINCODE_DATASET table
+                if wants_streaming(request):
+                    return streaming_json_response([])
+                return JsonResponse({
+                    'vendors': [],
+                    'next_cursor': None,
+                    'has_more': False,
+                    'notice': f"Pincode {near} is not in the pincode table, so no nearby vendors can be found"
+                })
+            try:
+                radius_km = float(request.GET.get('radius_km', settings.VENDOR_NEAR_DEFAULT_RADIUS_KM))
+            except ValueError:
+                return JsonResponse({'error': 'radius_km must be a number'}, status=400)
+            if not 0 < radius_km <= settings.VENDOR_NEAR_MAX_RADIUS_KM:
+                return JsonResponse({
+                    'error': f"radius_km must be between 0 and {settings.VENDOR_NEAR_MAX_RADIUS_KM}"
+                }, status=400)
+            vendors = filter_vendors_near(vendors, latitude, longitude, radius_km)
+            ordering = ['distance', 'id']
+        
+        # Vendors whose price range overlaps the requested one
+        min_price = request.GET.get('min_price')
+        max_price = request.GET.get('max_price')
+        try:
+            if min_price:
+                vendors = vendors.filter(max_price__gte=_parse_price(min_price))
+            if max_price:
+                vendors = vendors.filter(min_price__lte=_parse_price(max_price))
+        except InvalidOperation:
+            return JsonResponse({'error': 'min_price and max_price must be numbers'}, status=400)
+        
+        # Vendors free on a day, or on every day of an inclusive range
+        available_on = request.GET.get('available_on')
+        available_between = request.GET.get('available_between')
+        if available_on or available_between:
+            try:
+                start_date, end_date = _parse_available_dates(available_on, available_between)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+            vendors = filter_vendors_available(vendors, start_date, end_date)
+        
+        sort = request.GET.get('sort')
+        if sort in PRICE_ORDERINGS:
+            # Vendors without services or packages have no price to sort by
+            vendors = vendors.filter(min_price__isnull=False)
+            ordering = PRICE_ORDERINGS[sort]
+        elif sort and sort != 'rating':
+            return JsonResponse({'error': f"sort must be one of rating, {', '.join(PRICE_ORDERINGS)}"}, status=400)
+        
+        # Stream the whole result instead of a page when asked
+        if wants_streaming(request):
+            return streaming_json_response(
+                _stream_vendor_list(request, vendors.order_by(*ordering), inline_images)
+            )
+        
+        # Seek past the previous page by the ordering instead of counting and offsetting
+        paginator = KeysetPaginator(ordering, page_size)
+        vendors, next_cursor = paginator.paginate(vendors, request.GET.get('cursor'))
+        
+        # Batch-load images so the page costs a fixed number of queries
+        vendor_ids = [vendor.id for vendor in vendors]
+        images_by_vendor = load_list_images(vendor_ids, with_data=inline_images)
+        
+        vendor_data = [
+            _vendor_list_item(request, vendor, images_by_vendor, inline_images)
+            for vendor in vendors
+        ]
+        
+        return JsonResponse({
+            'vendors': vendor_data,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        })
+    
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def vendor_search(request):
+    """Typeahead search over vendor name, city, address and categories"""
+    try:
+        query = request.GET.get('q', '')
+        limit = min(int(request.GET.get('limit', 8)), MAX_SEARCH_RESULTS)
+        
+        results = [{
+            'id': vendor.id,
+            'business_name': vendor.business_name,
+            'city': vendor.city,
+            'categories': vendor.categories,
+            'rating': float(vendor.rating),
+            'score': round(float(vendor.score), 4)
+        } for vendor in search_vendors(query, limit=limit)]
+        
+        return JsonResponse({'query': query, 'results': results})
+    
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a number'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def vendor_facets(request):
+    """Verified vendor counts per category and per city, from precomputed rows"""
+    try:
+        category = request.GET.get('category', '')
+        city = normalize_city(request.GET.get('city', ''))
+        
+        # Categories within the chosen city and cities within the chosen category
+        rows = VendorFacetCount.objects.filter(is_verified=True, vendor_count__gt=0).filter(
+            Q(city=city) | Q(category_name=category)
+        ).values_list('category_name', 'city', 'vendor_count')
+        
+        total = 0
+        categories = []
+        cities = []
+        for category_name, facet_city, vendor_count in rows:
+            if category_name == category and facet_city == city:
+                total = vendor_count
+            elif facet_city == city and category_name:
+                categories.append({'name': category_name, 'count': vendor_count})
+            elif category_name == category and facet_city:
+                cities.append({'name': facet_city, 'count': vendor_count})
+        
+        categories.sort(key=lambda facet: (-facet['count'], facet['name']))
+        cities.sort(key=lambda facet: (-facet['count'], facet['name']))
+        return JsonResponse({
+            'category': category or None,
+            'city': city or None,
+            'total': total,
+            'categories': categories,
+            'cities': cities
+        })
     
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -73,7 +302,18 @@ def vendor_list(request):
 def vendor_detail(request, vendor_id):
     """Get detailed information about a specific vendor"""
     try:
-        vendor = VendorProfile.objects.get(id=vendor_id, is_verified=True)
+        inline_images = wants_inline_images(request)
+        
+        # Payloads are cached per content version, bumped by vendors.signals
+        variant = f"{'inline' if inline_images else 'url'}:{request.get_host()}"
+        cache_key = detail_cache_key(vendor_id, variant)
+        vendor_data = get_cached_detail(cache_key)
+        if vendor_data is not None:
+            response = JsonResponse({'vendor': vendor_data})
+            response['X-Cache'] = 'HIT'
+            return response
+        
+        vendor = VendorProfile.objects.select_related('user').get(id=vendor_id, is_verified=True)
         
         # Get vendor services
         services = VendorService.objects.filter(vendor=vendor)
@@ -99,21 +339,17 @@ def vendor_detail(request, vendor_id):
         
         # Get vendor images organized by category
         vendor_images = VendorCategoryImages.objects.filter(vendor=vendor).order_by('category_name', 'image_order')
+        if not inline_images:
+            vendor_images = without_image_data(vendor_images)
+        
         images_by_category = {}
         for image in vendor_images:
             if image.category_name not in images_by_category:
                 images_by_category[image.category_name] = []
             
-            image_base64 = base64.b64encode(image.image_data).decode('utf-8')
-            image_url = f"data:{image.image_type};base64,{image_base64}"
-            
-            images_by_category[image.category_name].append({
-                'id': image.id,
-                'image_url': image_url,
-                'image_name': image.image_name,
-                'is_featured': image.is_featured,
-                'order': image.image_order
-            })
+            images_by_category[image.category_name].append(
+                _category_image_data(request, image, inline_images)
+            )
         
         vendor_data = {
             'id': vendor.id,
@@ -129,16 +365,16 @@ def vendor_detail(request, vendor_id):
             'rating': float(vendor.rating),
             'total_reviews': vendor.total_reviews,
             'subscription_plan': vendor.subscription_plan,
-            'business_info': vendor.business_info,
-            'pricing_info': vendor.pricing_info,
-            'availability_info': vendor.availability_info,
             'services': service_data,
             'packages': package_data,
             'images_by_category': images_by_category,
             'created_at': vendor.user.date_joined.isoformat()
         }
         
-        return JsonResponse({'vendor': vendor_data})
+        set_cached_detail(cache_key, vendor_data)
+        response = JsonResponse({'vendor': vendor_data})
+        response['X-Cache'] = 'MISS'
+        return response
     
     except VendorProfile.DoesNotExist:
         return JsonResponse({'error': 'Vendor not found'}, status=404)
@@ -163,30 +399,22 @@ def upload_vendor_category_image(request):
         if 'image' not in request.FILES:
             return JsonResponse({'error': 'No image file provided'}, status=400)
         
-        image_file = request.FILES['image']
-        
-        # Validate image type
-        allowed_types = ['image/jpeg', 'image/jpg', 'image/png']
-        if image_file.content_type not in allowed_types:
-            return JsonResponse({'error': 'Only JPEG, JPG, and PNG files are allowed'}, status=400)
-        
         # Validate category belongs to vendor
         if category_name not in vendor_profile.categories:
             return JsonResponse({'error': 'Category not assigned to vendor'}, status=400)
         
-        # Read image data
-        image_data = image_file.read()
-        
-        # Create image record
-        vendor_image = VendorCategoryImages.objects.create(
-            vendor=vendor_profile,
-            category_name=category_name,
-            image_data=image_data,
-            image_name=image_file.name,
-            image_type=image_file.content_type,
-            image_order=image_order,
-            is_featured=is_featured
-        )
+        # Spool, sniff and verify the upload without holding it in memory
+        with receive_image(request.FILES['image']) as upload:
+            vendor_image = VendorCategoryImages(
+                vendor=vendor_profile,
+                category_name=category_name,
+                image_name=upload.name,
+                image_order=image_order,
+                is_featured=is_featured
+            )
+            store_image_upload(vendor_image, upload)
+            vendor_image.save()
+        schedule_renditions(vendor_image.blob_hash)
         
         return JsonResponse({
             'message': 'Image uploaded successfully',
@@ -195,10 +423,99 @@ def upload_vendor_category_image(request):
             'image_order': image_order
         })
     
+    except UploadRejected as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except VendorProfile.DoesNotExist:
+        return JsonResponse({'error': 'Vendor profile not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@login_required
+def upload_vendor_category_images(request):
+    """Upload many images for one or more vendor categories in one request"""
+    uploads = []
+    try:
+        if request.user.user_type != 'vendor':
+            return JsonResponse({'error': 'Only vendors can upload images'}, status=403)
+        
+        vendor_profile = VendorProfile.objects.get(user=request.user)
+        
+        image_files = request.FILES.getlist('images')
+        if not image_files:
+            return JsonResponse({'error': 'No image files provided'}, status=400)
+        if len(image_files) > settings.VENDOR_BULK_UPLOAD_MAX_FILES:
+            return JsonResponse({
+                'error': f"At most {settings.VENDOR_BULK_UPLOAD_MAX_FILES} images per upload"
+            }, status=400)
+        
+        # Either one category_name for every image or one per image, in order
+        category_names = request.POST.getlist('category_names')
+        if not category_names and request.POST.get('category_name'):
+            category_names = [request.POST['category_name']] * len(image_files)
+        if len(category_names) != len(image_files):
+            return JsonResponse({'error': 'Provide category_name or one category_names entry per image'}, status=400)
+        
+        unknown = sorted(set(category_names) - set(vendor_profile.categories))
+        if unknown:
+            return JsonResponse({'error': f"Categories not assigned to vendor: {', '.join(unknown)}"}, status=400)
+        
+        # Spool every file, then verify them all in parallel
+        uploads, errors = receive_images(image_files)
+        if errors:
+            return JsonResponse({
+                'error': 'Some images were rejected, nothing was saved',
+                'rejected': [{'image_name': name, 'error': message} for name, message in errors]
+            }, status=400)
+        
+        vendor_images = []
+        for category_name, upload in zip(category_names, uploads):
+            vendor_image = VendorCategoryImages(
+                vendor=vendor_profile,
+                category_name=category_name,
+                image_name=upload.name
+            )
+            store_image_upload(vendor_image, upload)
+            vendor_images.append(vendor_image)
+        
+        with transaction.atomic():
+            # Lock the vendor so concurrent uploads cannot take the same image_order
+            VendorProfile.objects.select_for_update().filter(id=vendor_profile.id).exists()
+            next_order = {
+                row['category_name']: row['last_order'] + 1
+                for row in VendorCategoryImages.objects.filter(
+                    vendor=vendor_profile,
+                    category_name__in=set(category_names)
+                ).values('category_name').annotate(last_order=Max('image_order')).order_by()
+            }
+            for vendor_image in vendor_images:
+                vendor_image.image_order = next_order.get(vendor_image.category_name, 0)
+                next_order[vendor_image.category_name] = vendor_image.image_order + 1
+            
+            VendorCategoryImages.objects.bulk_create(vendor_images)
+            # bulk_create sends no post_save signals
+            bump_detail_version_on_commit(vendor_profile.id)
+            for blob_hash in {vendor_image.blob_hash for vendor_image in vendor_images}:
+                schedule_renditions(blob_hash)
+        
+        return JsonResponse({
+            'message': f"{len(vendor_images)} images uploaded successfully",
+            'images': [{
+                'image_id': vendor_image.id,
+                'image_name': vendor_image.image_name,
+                'category_name': vendor_image.category_name,
+                'image_order': vendor_image.image_order
+            } for vendor_image in vendor_images]
+        })
+    
     except VendorProfile.DoesNotExist:
         return JsonResponse({'error': 'Vendor profile not found'}, status=404)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+    finally:
+        for upload in uploads:
+            upload.close()
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -211,31 +528,25 @@ def vendor_dashboard_data(request):
         
         vendor_profile = VendorProfile.objects.get(user=request.user)
         
-        # Get images organized by category
-        dashboard_data = {}
-        for category in vendor_profile.categories:
-            category_images = VendorCategoryImages.objects.filter(
+        # One metadata-only query for every category; clients fetch bytes by URL
+        category_images = without_image_data(
+            VendorCategoryImages.objects.filter(
                 vendor=vendor_profile,
-                category_name=category
-            ).order_by('image_order')
-            
-            images = []
-            for img in category_images:
-                image_base64 = base64.b64encode(img.image_data).decode('utf-8')
-                image_url = f"data:{img.image_type};base64,{image_base64}"
-                
-                images.append({
-                    'id': img.id,
-                    'image_url': image_url,
-                    'image_name': img.image_name,
-                    'order': img.image_order,
-                    'is_featured': img.is_featured
-                })
-            
-            dashboard_data[category] = {
-                'images': images,
-                'total_images': len(images)
-            }
+                category_name__in=vendor_profile.categories
+            )
+        ).annotate(
+            category_total=Window(expression=Count('id'), partition_by=[F('category_name')])
+        ).order_by('category_name', 'image_order', 'id')
+        
+        dashboard_data = {
+            category: {'images': [], 'total_images': 0}
+            for category in vendor_profile.categories
+        }
+        variant = list_image_variant(request)
+        for img in category_images:
+            category_data = dashboard_data[img.category_name]
+            category_data['images'].append(_category_image_data(request, img, False, variant=variant))
+            category_data['total_images'] = img.category_total
         
         return JsonResponse({
             'vendor_info': {
@@ -110,8 +110,8 @@ export const bookingsAPI = {
   getBooking: (bookingId: number) => api.get(`/bookings/${bookingId}/`),
   updateBooking: (bookingId: number, data: any) => 
     api.put(`/bookings/${bookingId}/`, data),
-  getBookingMessages: (bookingId: number) => 
-    api.get(`/bookings/${bookingId}/messages/`),
+  getBookingMessages: (bookingId: number, params?: { before?: number; after?: number; limit?: number }) => 
+    api.get(`/bookings/${bookingId}/messages/`, { params }),
   sendBookingMessage: (bookingId: number, message: string) => 
     api.post(`/bookings/${bookingId}/messages/`, { message }),
 };